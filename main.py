@@ -1,8 +1,64 @@
+import argparse
+import json
+from pathlib import Path
 from src import RuleBridge
+from src.core.constants import SERVICE_SETTINGS
 
 def main():
-    bridge = RuleBridge()
+    parser = argparse.ArgumentParser(description="Generate static analysis rules from natural language")
+    parser.add_argument('--serve', action='store_true', help="Run as a local HTTP service")
+    parser.add_argument('--host', default=SERVICE_SETTINGS['HOST'], help="Loopback address to bind")
+    parser.add_argument('--port', type=int, default=SERVICE_SETTINGS['PORT'])
+    parser.add_argument('--socket', help="Listen on a unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=SERVICE_SETTINGS['MAX_WORKERS'])
+    parser.add_argument('--queue', type=int, default=SERVICE_SETTINGS['MAX_QUEUE'])
+    parser.add_argument('--scan', metavar='RULE', help="Scan a repository with a generated ruleset or bundle manifest")
+    parser.add_argument('--repo', default='.', help="Repository to scan")
+    parser.add_argument('--language', default='java', help="Language of the scanned files")
+    parser.add_argument('--base-ref', help="Only scan files changed since this git ref")
+    parser.add_argument('--cache-dir', help="Persistent PMD analysis cache directory")
+    parser.add_argument('--compare-full', action='store_true', help="Also time a full scan")
+    parser.add_argument('--bundle', nargs='*', metavar='RULE',
+                        help="Bundle rulesets by language (defaults to every indexed rule)")
+    parser.add_argument('--output', default='bundles', help="Output directory for bundles")
+    parser.add_argument('--regenerate', action='store_true',
+                        help="Generate the rule even if an equivalent one is already indexed")
+    args = parser.parse_args()
+
+    if args.bundle is not None:
+        from src.core import RuleIndex, RulesetBundler
+        rule_files = args.bundle or sorted({entry['path'] for entry in RuleIndex().entries if entry['path']})
+        RulesetBundler().bundle([Path(rule_file) for rule_file in rule_files if Path(rule_file).exists()], args.output)
+        return
+
+    if args.scan and args.scan.endswith('.json'):
+        from src.core.analyzer import PMDAnalyzer
+        result = PMDAnalyzer().scan_bundles(
+            Path(args.scan), Path(args.repo), args.base_ref, Path(args.cache_dir) if args.cache_dir else None
+        )
+        if result:
+            print(json.dumps(result, indent=2))
+        return
+
+    if args.scan:
+        from src.core.analyzer import PMDAnalyzer
+        result = PMDAnalyzer().scan(
+            Path(args.scan), Path(args.repo), args.language,
+            args.base_ref, Path(args.cache_dir) if args.cache_dir else None, args.compare_full
+        )
+        if result:
+            summary = {key: value for key, value in result.items() if key != 'report'}
+            print(json.dumps(summary, indent=2))
+            print(json.dumps(result['report'], indent=2))
+        return
+
+    if args.serve:
+        from src.core.service import serve
+        serve(args.host, args.port, args.socket, args.workers, args.queue)
+        return
+
+    bridge = RuleBridge(reuse_existing=not args.regenerate)
     bridge.process()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
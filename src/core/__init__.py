@@ -1,5 +1,11 @@
 from .bridge import RuleBridge
 from .auth import TokenManager
 from .templates import XMLTemplates
+from .xpath_linter import XPathLinter
+from .rule_index import RuleIndex
+from .compact_ast import CompactAST
+from .baseline import IssueBaseline
+from .ruleset_bundler import RulesetBundler
+from .scheduler import PipelineScheduler
 
-__all__ = ['RuleBridge', 'TokenManager', 'XMLTemplates'] 
\ No newline at end of file
+__all__ = ['RuleBridge', 'TokenManager', 'XMLTemplates', 'XPathLinter', 'RuleIndex', 'CompactAST', 'IssueBaseline', 'RulesetBundler', 'PipelineScheduler'] 
\ No newline at end of file
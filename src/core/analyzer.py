@@ -1,28 +1,42 @@
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Iterator, Tuple
+import xml.etree.ElementTree as ET
 import subprocess
 import json
 import shlex
+import time
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from .constants import PMD_PROFILE, PMD_SCAN, LANGUAGE_EXTENSIONS
+from .ruleset_bundler import RulesetBundler
 
 class PMDAnalyzer:
     PMD_IMAGE = "docker.io/lobocode/pmd:7.10.0"
     
-    def _build_check_command(self, rule_file: Path, source_path: Path, language: str) -> List[str]:
+    def _build_check_command(self, rule_file: Path, source_path: Path, language: str,
+                             fail_on_violation: bool = True) -> List[str]:
         """
         Build safe command list for PMD check
         """
-        return [
+        mounts = ['-v', f"{source_path.parent}:/src:Z"]
+        if rule_file.parent == source_path.parent:
+            # Rule and sources share one job directory, mount it once
+            rules_dir = '/src'
+        else:
+            rules_dir = '/rules'
+            mounts.extend(['-v', f"{rule_file.parent}:/rules:Z"])
+
+        cmd = [
             'podman',
             'run',
             '--rm',
-            '-v',
-            f"{source_path.parent}:/src:Z",
-            '-v',
-            f"{rule_file.parent}:/rules:Z",
+            *mounts,
             self.PMD_IMAGE,
             'check',
             '-R',
-            f"/rules/{rule_file.name}",
+            f"{rules_dir}/{rule_file.name}",
             '-d',
             f"src/{source_path.name}",
             f"-l={shlex.quote(language)}",
@@ -30,7 +44,44 @@ class PMDAnalyzer:
             'json'
         ]
 
-    def analyze(self, rule_file: Path, source_path: Path, language: str) -> Optional[Dict]:
+        if not fail_on_violation:
+            cmd.append('--no-fail-on-violation')
+
+        return cmd
+
+    def _build_scan_command(self, rule_file: Path, repo_path: Path, language: str, cache_dir: Path,
+                            file_list: Optional[Path] = None) -> List[str]:
+        """
+        Build safe command list for a repository scan
+
+        Only the repository or corpus (read-only, as /src) and cache_dir
+        (as /cache) are mounted. rule_file and file_list must live in cache_dir; without
+        a file list the whole repository is scanned with the cache disabled.
+        Both mounts use the shared SELinux label, since parallel language
+        passes mount them at the same time.
+        """
+        return [
+            'podman',
+            'run',
+            '--rm',
+            '-v',
+            f"{repo_path}:/src:ro,z",
+            '-v',
+            f"{cache_dir}:/cache:z",
+            self.PMD_IMAGE,
+            'check',
+            '-R',
+            f"/cache/{rule_file.name}",
+            *(['--file-list', f"/cache/{file_list.name}"] if file_list else ['-d', '/src']),
+            f"-l={shlex.quote(language)}",
+            '-f',
+            'json',
+            *(['--cache', f"/cache/{shlex.quote(language)}.cache"] if file_list else ['--no-cache']),
+            '--no-fail-on-violation'
+        ]
+
+    def analyze(self, rule_file: Path, source_path: Path, language: str,
+                fail_on_violation: bool = True) -> Optional[Dict]:
         """
         Analyze source code using PMD rule via podman
         
@@ -38,6 +89,7 @@ class PMDAnalyzer:
             rule_file: Path to PMD rule XML
             source_path: Path to source code to analyze
             language: Programming language to analyze
+            fail_on_violation: Treat PMD's non-zero exit on violations as an error
         """
         if not all(isinstance(x, (Path, str)) for x in [rule_file, source_path, language]):
             print("Invalid input types")
@@ -45,7 +97,7 @@ class PMDAnalyzer:
 
         try:
             # Build and run command
-            cmd = self._build_check_command(rule_file, source_path, language)
+            cmd = self._build_check_command(rule_file, source_path, language, fail_on_violation=fail_on_violation)
             result = subprocess.run(
                 cmd,
                 capture_output=True,
@@ -65,4 +117,299 @@ class PMDAnalyzer:
 
         except Exception as e:
             print(f"Error during analysis: {e}")
-            return None 
\ No newline at end of file
+            return None 
+
+    def profile(self, rule_file: Path, corpus_path: Optional[Path] = None, language: str = 'java',
+                budget_seconds: Optional[float] = None) -> Optional[Dict]:
+        """
+        Measure rule runtime against a reference corpus using PMD benchmark output
+
+        Args:
+            rule_file: Path to PMD rule XML
+            corpus_path: Directory with the reference corpus
+            language: Programming language to analyze
+            budget_seconds: Maximum execution time allowed per rule
+
+        Returns:
+            Dictionary with per-rule timings, violation counts and budget status
+        """
+        rule_file = Path(rule_file)
+        corpus_path = Path(corpus_path or PMD_PROFILE['CORPUS_DIR']).resolve()
+        budget = PMD_PROFILE['BUDGET_SECONDS'] if budget_seconds is None else budget_seconds
+
+        if not corpus_path.exists():
+            print(f"Reference corpus not found: {corpus_path}")
+            return None
+
+        try:
+            with tempfile.TemporaryDirectory() as rules_dir:
+                # Mount the corpus itself read-only and the rule from a private directory
+                rule_copy = Path(rules_dir) / rule_file.name
+                shutil.copyfile(rule_file, rule_copy)
+                cmd = self._build_scan_command(rule_copy, corpus_path, language, Path(rules_dir))
+                # Timing report goes to stderr
+                cmd.append('--benchmark')
+                start_time = time.perf_counter()
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    check=False  # Don't raise exception on non-zero exit
+                )
+                wall_time = time.perf_counter() - start_time
+
+            if result.returncode != 0:
+                print(f"Error running PMD benchmark: {result.stderr}")
+                return None
+
+            try:
+                report = json.loads(result.stdout)
+            except json.JSONDecodeError:
+                print("Error parsing PMD output")
+                return None
+
+            timings = self._parse_benchmark(result.stderr)
+            violations = {}
+            for violation in self.iter_violations(report):
+                violations[violation.get('rule')] = violations.get(violation.get('rule'), 0) + 1
+
+            rules = []
+            for name in self._rule_names(rule_file):
+                # Wall time includes podman and JVM start-up, never use it as rule time
+                if name not in timings:
+                    print(f"Error profiling rule {name}: no timing in PMD benchmark output")
+                    return None
+                execution_time = timings[name]
+                rules.append({
+                    'name': name,
+                    'execution_time': round(execution_time, 4),
+                    'violations': violations.get(name, 0),
+                    'within_budget': execution_time <= budget
+                })
+
+            return {
+                'corpus': str(corpus_path),
+                'language': language,
+                'wall_time': round(wall_time, 4),
+                'budget_seconds': budget,
+                'rules': rules,
+                'within_budget': all(rule['within_budget'] for rule in rules)
+            }
+
+        except Exception as e:
+            print(f"Error during profiling: {e}")
+            return None
+
+    def iter_violations(self, report: Dict) -> Iterator[Dict]:
+        """
+        Iterate violations of a flat or per-file PMD JSON report
+        """
+        yield from report.get('violations', [])
+        for file_entry in report.get('files', []):
+            for violation in file_entry.get('violations', []):
+                yield dict(violation, file=violation.get('file', file_entry.get('filename', '')))
+
+    def scan(self, rule_file: Path, repo_path: Path, language: str, base_ref: Optional[str] = None,
+             cache_dir: Optional[Path] = None, compare_full: bool = False) -> Optional[Dict]:
+        """
+        Scan a repository, optionally restricted to files changed since a git ref
+
+        The PMD analysis cache is kept in cache_dir across runs.
+
+        Args:
+            rule_file: Path to PMD rule XML
+            repo_path: Root of the git repository to scan
+            language: Programming language to analyze
+            base_ref: Git ref to diff against; scans everything when omitted
+            cache_dir: Persistent directory for the PMD analysis cache
+            compare_full: Also time a full scan to measure the real speedup
+
+        Returns:
+            Dictionary with the PMD report, scanned files, timings and speedup
+        """
+        rule_file = Path(rule_file).resolve()
+        repo_path = Path(repo_path).resolve()
+        cache_dir = Path(cache_dir or PMD_SCAN['CACHE_DIR']).resolve()
+
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            all_files = self._git_files(repo_path, language, ['ls-files'])
+            if all_files is None:
+                return None
+
+            if base_ref:
+                merge_base = self._git(repo_path, ['merge-base', base_ref, 'HEAD'])
+                if not merge_base:
+                    return None
+                files = self._git_files(repo_path, language, ['diff', '--name-only', '--diff-filter=ACMR', merge_base])
+                if files is None:
+                    return None
+            else:
+                files = all_files
+
+            # The ruleset travels in the cache mount instead of a mount of its own
+            ruleset = cache_dir / f"rules-{language}.xml"
+            shutil.copyfile(rule_file, ruleset)
+
+            report, elapsed = {'violations': []}, 0.0
+            if files:
+                file_list = cache_dir / f"files-{language}.txt"
+                file_list.write_text(
+                    '\n'.join(f"/src/{path}" for path in files) + '\n',
+                    encoding='utf-8'
+                )
+                cmd = self._build_scan_command(ruleset, repo_path, language, cache_dir, file_list)
+                report, elapsed = self._timed_check(cmd)
+                if report is None:
+                    return None
+
+            result = {
+                'base_ref': base_ref,
+                'files_scanned': len(files),
+                'files_total': len(all_files),
+                'elapsed_seconds': round(elapsed, 3),
+                'report': report,
+                # Without a measured full scan, estimate from the file ratio
+                'speedup': round(len(all_files) / len(files), 2) if files else None,
+                'speedup_measured': False
+            }
+
+            if compare_full and base_ref and files:
+                cmd = self._build_scan_command(ruleset, repo_path, language, cache_dir)
+                _, full_elapsed = self._timed_check(cmd)
+                result['full_elapsed_seconds'] = round(full_elapsed, 3)
+                result['speedup'] = round(full_elapsed / elapsed, 2) if elapsed else None
+                result['speedup_measured'] = True
+
+            return result
+
+        except Exception as e:
+            print(f"Error during scan: {e}")
+            return None
+
+    def scan_bundles(self, manifest_file: Path, repo_path: Path, base_ref: Optional[str] = None,
+                     cache_dir: Optional[Path] = None, max_workers: Optional[int] = None) -> Optional[Dict]:
+        """
+        Run one PMD pass per language bundle, in parallel
+
+        Each pass only receives the files of its language, so PMD never
+        parses sources for languages without active rules.
+
+        Args:
+            manifest_file: Manifest written by RulesetBundler
+            repo_path: Root of the git repository to scan
+            base_ref: Git ref to diff against; scans everything when omitted
+            cache_dir: Persistent directory for the PMD analysis caches
+            max_workers: Maximum concurrent PMD passes (defaults to one per language)
+
+        Returns:
+            Dictionary with per-language scan results and total violations
+        """
+        manifest = RulesetBundler().load_manifest(manifest_file)
+        if not manifest:
+            return None
+
+        languages = manifest['languages']
+        if not languages:
+            return {'languages': {}, 'violations': 0, 'elapsed_seconds': 0.0}
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers or len(languages)) as executor:
+            futures = {
+                language: executor.submit(self.scan, Path(entry['path']), repo_path, language, base_ref, cache_dir)
+                for language, entry in languages.items()
+            }
+            results = {language: future.result() for language, future in futures.items()}
+
+        return {
+            'languages': results,
+            'violations': sum(
+                sum(1 for _ in self.iter_violations(result['report']))
+                for result in results.values() if result
+            ),
+            'elapsed_seconds': round(time.perf_counter() - start_time, 3)
+        }
+
+    def _timed_check(self, cmd: List[str]) -> Tuple[Optional[Dict], float]:
+        """
+        Run a PMD check command, returning (report, elapsed seconds)
+        """
+        start_time = time.perf_counter()
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        elapsed = time.perf_counter() - start_time
+
+        if result.returncode != 0:
+            print(f"Error running PMD check: {result.stderr}")
+            return None, elapsed
+
+        try:
+            return json.loads(result.stdout), elapsed
+        except json.JSONDecodeError:
+            print("Error parsing PMD output")
+            return None, elapsed
+
+    def _git(self, repo_path: Path, args: List[str]) -> Optional[str]:
+        result = subprocess.run(['git', '-C', str(repo_path), *args], capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            print(f"Error running git {args[0]}: {result.stderr.strip()}")
+            return None
+        return result.stdout.strip()
+
+    def _git_files(self, repo_path: Path, language: str, args: List[str]) -> Optional[List[str]]:
+        """
+        List files reported by a git command, keeping only the language's sources
+        """
+        output = self._git(repo_path, args)
+        if output is None:
+            return None
+        ext = LANGUAGE_EXTENSIONS.get(language.lower(), '.txt')
+        return [path for path in output.splitlines() if path.endswith(ext) and (repo_path / path).exists()]
+
+    def save_profile(self, rule_file: Path, profile: Dict) -> Optional[Path]:
+        """
+        Store profiling results next to the rule file
+        """
+        try:
+            profile_file = Path(rule_file).with_suffix('.profile.json')
+            with open(profile_file, 'w', encoding='utf-8') as f:
+                json.dump(profile, f, indent=2)
+            return profile_file
+        except Exception as e:
+            print(f"Error saving profile: {e}")
+            return None
+
+    def _parse_benchmark(self, output: str) -> Dict[str, float]:
+        """
+        Extract per-rule execution time (seconds) from PMD timing report
+
+        Sections open with a banner such as "-----<<< Rule >>>-----"
+        followed by a "Label  Time (secs) ..." header row; only rows of the
+        "Rule" section carry per-rule timings.
+        """
+        timings = {}
+        in_rule_section = False
+
+        for line in output.splitlines():
+            stripped = line.strip()
+            banner = re.match(r'^-*<<<\s*(.+?)\s*>>>-*$', stripped)
+            if banner:
+                in_rule_section = banner.group(1).lower() == 'rule'
+                continue
+            if not in_rule_section or not stripped or stripped.startswith('Label'):
+                continue
+            match = re.match(r'^(\S+)\s+(\d+(?:[.,]\d+)?)', stripped)
+            if match:
+                timings[match.group(1)] = float(match.group(2).replace(',', '.'))
+
+        return timings
+
+    def _rule_names(self, rule_file: Path) -> List[str]:
+        """
+        List rule names declared in a PMD ruleset
+        """
+        try:
+            root = ET.parse(rule_file).getroot()
+            return [rule.get('name') for rule in root.iter() if rule.tag.split('}')[-1] == 'rule' and rule.get('name')]
+        except Exception as e:
+            print(f"Error reading ruleset: {e}")
+            return []
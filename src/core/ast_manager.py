@@ -1,18 +1,46 @@
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
+from collections import OrderedDict
+import io
 import json
 import tempfile
 import subprocess
 import hashlib
 import shlex
+import threading
+from .constants import LANGUAGE_EXTENSIONS, AST_CACHE
+from .compact_ast import CompactAST
+from src.utils.workspace import WorkspaceManager
+
+# Separator lines written between dumps of a bulk AST run
+BULK_MARKER = b'@@RULEBRIDGE-AST@@ '
+BULK_FAILED = b'@@RULEBRIDGE-FAILED@@ '
+
+# Dumps every file passed as argument within one container; markers start
+# on a fresh line even when a dump does not end with a newline
+BULK_SCRIPT = (
+    'lang="$1"; format="$2"; shift 2; '
+    'for f in "$@"; do '
+    'printf "\\n@@RULEBRIDGE-AST@@ %s\\n" "$f"; '
+    'pmd ast-dump --file "/src/$f" -l="$lang" -e=UTF-8 ${format:+--format=$format} '
+    '|| printf "\\n@@RULEBRIDGE-FAILED@@ %s\\n" "$f"; '
+    'done'
+)
 
 class ASTManager:
     PMD_IMAGE = "docker.io/lobocode/pmd:7.10.0"
     
-    def __init__(self, use_cache: bool = False):
-        self.temp_dir = Path(tempfile.mkdtemp())
+    def __init__(self, use_cache: bool = False, compact: bool = False,
+                 workspaces: Optional[WorkspaceManager] = None):
+        self.workspaces = workspaces or WorkspaceManager()
         self.use_cache = use_cache
+        self.compact = compact
         self.cache_dir = Path('.ast_cache') if use_cache else None
+        # Bounded LRU keyed by snippet digest, ASTs of a long-running
+        # service must not accumulate without limit
+        self.memory_cache = OrderedDict()
+        self.memory_cache_size = AST_CACHE['MEMORY_ENTRIES']
+        self._cache_lock = threading.Lock()
         
         if self.use_cache:
             self.cache_dir.mkdir(exist_ok=True)
@@ -21,29 +49,23 @@ class ASTManager:
         """
         Get file extension based on language
         """
-        extensions = {
-            'java': '.java',
-            'python': '.py',
-            'javascript': '.js',
-            'typescript': '.ts',
-            'ruby': '.rb',
-            'go': '.go',
-            'cpp': '.cpp',
-            'c': '.c',
-            'php': '.php',
-            'scala': '.scala',
-            'kotlin': '.kt',
-            'xml': '.xml',
-            'yaml': '.yml',
-            'json': '.json'
-        }
-        return extensions.get(language.lower(), '.txt')
-
-    def _build_ast_command(self, temp_file: Path, language: str) -> List[str]:
+        return LANGUAGE_EXTENSIONS.get(language.lower(), '.txt')
+
+    def get_cache_path(self, code: str, language: str) -> Path:
+        """
+        Get cache file path for a code snippet
+        """
+        suffix = '.compact.json' if self.compact else '.json'
+        return self.cache_dir / f"{self._cache_key(code, language)}{suffix}"
+
+    def _cache_key(self, code: str, language: str) -> str:
+        return hashlib.sha256(f"{language}:{code}".encode('utf-8')).hexdigest()
+
+    def _build_ast_command(self, temp_file: Path, language: str, output_format: Optional[str] = None) -> List[str]:
         """
         Build safe command list for PMD AST dump
         """
-        return [
+        cmd = [
             'podman',
             'run',
             '--rm',
@@ -57,6 +79,11 @@ class ASTManager:
             '-e=UTF-8'
         ]
 
+        if output_format:
+            cmd.extend(['--format', output_format])
+
+        return cmd
+
     def generate_ast(self, code: str, language: str) -> Optional[Dict]:
         """
         Generate AST using PMD via podman
@@ -66,21 +93,22 @@ class ASTManager:
             return None
 
         try:
-            # Create temporary file with proper extension
-            ext = self.get_temp_file_extension(language)
-            temp_file = self.temp_dir / f"temp{ext}"
-            
-            # Write code to temp file
-            temp_file.write_text(code, encoding='utf-8')
-
-            # Build and run command
-            cmd = self._build_ast_command(temp_file, language)
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=False  # Don't raise exception on non-zero exit
-            )
+            # Each dump gets its own job directory, so concurrent dumps never share files
+            with self.workspaces.job() as job_dir:
+                ext = self.get_temp_file_extension(language)
+                temp_file = job_dir / f"temp{ext}"
+                
+                # Write code to temp file
+                temp_file.write_text(code, encoding='utf-8')
+
+                # Build and run command
+                cmd = self._build_ast_command(temp_file, language)
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    check=False  # Don't raise exception on non-zero exit
+                )
 
             if result.returncode != 0:
                 print(f"Error generating AST: {result.stderr}")
@@ -96,10 +124,46 @@ class ASTManager:
         except Exception as e:
             print(f"Error in AST generation: {e}")
             return None
-        finally:
-            # Cleanup temp file
-            if temp_file.exists():
-                temp_file.unlink()
+
+    def generate_compact_ast(self, code: str, language: str) -> Optional[CompactAST]:
+        """
+        Generate a CompactAST, parsing PMD's XML dump while it is streamed
+        """
+        if not isinstance(code, str) or not isinstance(language, str):
+            print("Invalid input types")
+            return None
+
+        try:
+            with self.workspaces.job() as job_dir, tempfile.TemporaryFile() as stderr:
+                ext = self.get_temp_file_extension(language)
+                temp_file = job_dir / f"temp{ext}"
+                temp_file.write_text(code, encoding='utf-8')
+
+                cmd = self._build_ast_command(temp_file, language, output_format='xml')
+                # stderr goes to a file so a chatty JVM cannot block the stdout pipe
+                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+                try:
+                    ast = CompactAST.from_xml_stream(process.stdout)
+                except Exception:
+                    ast = None
+                finally:
+                    process.stdout.close()
+                    returncode = process.wait()
+
+                if returncode != 0:
+                    stderr.seek(0)
+                    print(f"Error generating AST: {stderr.read().decode('utf-8', 'replace')}")
+                    return None
+
+            if not ast:
+                print("Error parsing AST output")
+                return None
+
+            return ast
+
+        except Exception as e:
+            print(f"Error in AST generation: {e}")
+            return None
 
     def analyze_examples(self, rule_config: Dict) -> Dict:
         """
@@ -109,26 +173,176 @@ class ASTManager:
             rule_config: Rule configuration from entryPoint.json
             
         Returns:
-            Dictionary with AST for bad example
+            Dictionary with AST for bad example (CompactAST when compact is enabled)
         """
         language = rule_config['language']
         bad_example = rule_config['examples']['bad']
 
         # Use cache if enabled
-        if self.use_cache:
-            bad_cache = self.get_cache_path(bad_example, language)
-            
-            if bad_cache.exists():
-                return {
-                    'ast': json.loads(bad_cache.read_text())
-                }
+        ast = self._read_cache(bad_example, language)
+        if ast:
+            return {'ast': ast}
 
         # Generate AST
-        ast = self.generate_ast(bad_example, language)
+        if self.compact:
+            ast = self.generate_compact_ast(bad_example, language)
+        else:
+            ast = self.generate_ast(bad_example, language)
 
         # Cache result if enabled
-        if self.use_cache and ast:
-            bad_cache = self.get_cache_path(bad_example, language)
-            bad_cache.write_text(json.dumps(ast))
+        self._write_cache(bad_example, language, ast)
+
+        return {'ast': ast}
+
+    def analyze_examples_bulk(self, rule_configs: List[Dict]) -> List[Dict]:
+        """
+        Analyze bad examples of many rules with one PMD run per language
+
+        Args:
+            rule_configs: Rule configurations from entryPoint.json
+
+        Returns:
+            Dictionaries with 'ast' (bad example) per rule, as analyze_examples
+        """
+        asts = self.generate_asts_bulk([
+            (rule_config['examples']['bad'], rule_config['language']) for rule_config in rule_configs
+        ])
+        return [{'ast': ast} for ast in asts]
+
+    def generate_asts_bulk(self, examples: List[Tuple[str, str]]) -> List[Optional[Any]]:
+        """
+        Generate ASTs for many (code, language) pairs
+
+        Cached snippets are skipped, duplicates are dumped once, and the
+        rest are written into one workspace per language and dumped by a
+        single container run.
+
+        Returns:
+            ASTs aligned with the input (None where generation failed)
+        """
+        results = [self._read_cache(code, language) for code, language in examples]
+
+        pending = {}
+        for index, (code, language) in enumerate(examples):
+            if results[index] is None and isinstance(code, str) and isinstance(language, str):
+                pending.setdefault(language, {}).setdefault(code, []).append(index)
+
+        for language, snippets in pending.items():
+            codes = list(snippets)
+            asts = self._dump_language_bulk(codes, language)
+            for code, ast in zip(codes, asts):
+                self._write_cache(code, language, ast)
+                for index in snippets[code]:
+                    results[index] = ast
+
+        return results
+
+    def _build_bulk_ast_command(self, job_dir: Path, file_names: List[str], language: str,
+                                output_format: str) -> List[str]:
+        """
+        Build command dumping several files in one container run
+        """
+        return [
+            'podman',
+            'run',
+            '--rm',
+            '-v',
+            f"{job_dir}:/src:Z",
+            '--entrypoint',
+            'sh',
+            self.PMD_IMAGE,
+            '-c',
+            BULK_SCRIPT,
+            'sh',
+            language,
+            output_format,
+            *file_names
+        ]
+
+    def _dump_language_bulk(self, codes: List[str], language: str) -> List[Optional[Any]]:
+        """
+        Dump all snippets of one language and split the output back per file
+        """
+        output_format = 'xml' if self.compact else ''
+        parsed = {}
+
+        try:
+            with self.workspaces.job() as job_dir, tempfile.TemporaryFile() as stderr:
+                ext = self.get_temp_file_extension(language)
+                file_names = [f"example{index}{ext}" for index in range(len(codes))]
+                for file_name, code in zip(file_names, codes):
+                    (job_dir / file_name).write_text(code, encoding='utf-8')
+
+                cmd = self._build_bulk_ast_command(job_dir, file_names, language, output_format)
+                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+                try:
+                    # Only one dump is buffered at a time
+                    current, chunk = None, []
+                    for line in process.stdout:
+                        if line.startswith(BULK_FAILED):
+                            current, chunk = None, []
+                        elif line.startswith(BULK_MARKER):
+                            if current:
+                                parsed[current] = self._parse_dump(b''.join(chunk))
+                            current, chunk = line[len(BULK_MARKER):].strip().decode('utf-8'), []
+                        elif current:
+                            chunk.append(line)
+                    if current:
+                        parsed[current] = self._parse_dump(b''.join(chunk))
+                finally:
+                    process.stdout.close()
+                    returncode = process.wait()
+
+                if returncode != 0:
+                    stderr.seek(0)
+                    print(f"Error generating bulk AST: {stderr.read().decode('utf-8', 'replace')}")
+
+            return [parsed.get(file_name) for file_name in file_names]
+
+        except Exception as e:
+            print(f"Error in bulk AST generation: {e}")
+            return [None] * len(codes)
+
+    def _parse_dump(self, output: bytes) -> Optional[Any]:
+        try:
+            if self.compact:
+                return CompactAST.from_xml_stream(io.BytesIO(output)) or None
+            return json.loads(output)
+        except Exception:
+            print("Error parsing AST output")
+            return None
+
+    def _read_cache(self, code: str, language: str) -> Optional[Any]:
+        """
+        Look up an AST in memory, then on disk when caching is enabled
+        """
+        key = self._cache_key(code, language)
+        with self._cache_lock:
+            ast = self.memory_cache.get(key)
+            if ast is not None:
+                self.memory_cache.move_to_end(key)
+        if ast is not None or not self.use_cache:
+            return ast
+
+        cache_file = self.get_cache_path(code, language)
+        if not cache_file.exists():
+            return None
+
+        cached = cache_file.read_text()
+        ast = CompactAST.loads(cached) if self.compact else json.loads(cached)
+        self._remember(key, ast)
+        return ast
+
+    def _write_cache(self, code: str, language: str, ast: Optional[Any]) -> None:
+        if not ast:
+            return
+        self._remember(self._cache_key(code, language), ast)
+        if self.use_cache:
+            self.get_cache_path(code, language).write_text(ast.dumps() if self.compact else json.dumps(ast))
 
-        return {'ast': ast} 
\ No newline at end of file
+    def _remember(self, key: str, ast: Any) -> None:
+        with self._cache_lock:
+            self.memory_cache[key] = ast
+            self.memory_cache.move_to_end(key)
+            while len(self.memory_cache) > self.memory_cache_size:
+                self.memory_cache.popitem(last=False)
@@ -10,6 +10,7 @@ class TokenManager:
         self.auth_file = Path("config/auth.json")
         self.auth_url = "https://api.stackspot.com/v1/auth"
         self.post_url = "https://api.stackspot.com/v1/completions"
+        self._auth_data = None  # In-memory copy for long-running processes
         
         self.auth_header = {'Content-Type': 'application/x-www-form-urlencoded'}
         self.data_urlencode = {
@@ -51,6 +52,9 @@ class TokenManager:
 
     def ensure_valid_token(self) -> Dict:
         try:
+            if self._auth_data and not self.is_token_expired(self._auth_data):
+                return self._build_headers(self._auth_data)
+
             if self.auth_file.exists():
                 with open(self.auth_file, 'r') as f:
                     auth_data = json.load(f)
@@ -59,6 +63,7 @@ class TokenManager:
             else:
                 auth_data = self.get_token()
             
+            self._auth_data = auth_data
             return self._build_headers(auth_data) if auth_data else None
                 
         except Exception as e:
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import os
+import re
+import tempfile
+
+from .constants import ISSUE_BASELINE
+
+
+class IssueBaseline:
+    """
+    On-disk index of violation fingerprints from a previous conversion
+
+    A fingerprint hashes the rule, the file and the normalized source
+    lines of the violation, so issues keep their identity when code
+    above them moves. The index is a tab-separated file loaded into a
+    dict, giving O(1) lookup per violation while the report streams.
+    """
+
+    def __init__(self, baseline_file: Optional[str] = None, source_root: Optional[str] = None):
+        self.baseline_file = Path(baseline_file or ISSUE_BASELINE['FILE'])
+        self.source_root = Path(source_root) if source_root else None
+        self.entries = self._load()
+        self.seen = {}
+        self._occurrences = {}
+        self._read_lines = lru_cache(maxsize=ISSUE_BASELINE['FILE_CACHE_SIZE'])(self._read_file_lines)
+
+    def fingerprint(self, violation: Dict) -> str:
+        """
+        Stable fingerprint of a violation from rule, file and snippet
+        """
+        rule = violation.get('rule', 'unknown')
+        file_path = violation.get('file', '')
+        snippet = self._snippet(violation)
+        if snippet is None:
+            # Source not available, fall back to the violation message
+            snippet = violation.get('description', '')
+
+        digest = hashlib.blake2b(f"{rule}\0{file_path}\0{snippet}".encode('utf-8'), digest_size=16).hexdigest()
+
+        # Identical snippets in one file are told apart by occurrence order
+        occurrence = self._occurrences.get(digest, 0)
+        self._occurrences[digest] = occurrence + 1
+        return digest if occurrence == 0 else f"{digest}-{occurrence}"
+
+    def filter_new(self, violations: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Yield only violations missing from the baseline, recording all seen fingerprints
+
+        Each pass starts from an empty record, so one instance can filter
+        successive reports.
+        """
+        self.seen = {}
+        self._occurrences = {}
+        for violation in violations:
+            fingerprint = self.fingerprint(violation)
+            self.seen[fingerprint] = (
+                violation.get('rule', 'unknown'),
+                violation.get('file', ''),
+                str(violation.get('beginline', 1))
+            )
+            if fingerprint not in self.entries:
+                yield violation
+
+    def fixed(self) -> List[Dict]:
+        """
+        Baseline issues not seen in the current report
+        """
+        return [
+            {'fingerprint': fingerprint, 'ruleId': rule, 'filePath': file_path, 'line': int(line)}
+            for fingerprint, (rule, file_path, line) in self.entries.items()
+            if fingerprint not in self.seen
+        ]
+
+    def save(self) -> bool:
+        """
+        Replace the baseline with the fingerprints seen in the current report
+        """
+        temp_file = None
+        try:
+            self.baseline_file.parent.mkdir(parents=True, exist_ok=True)
+            # Unique temp file per save, concurrent saves never share one
+            fd, temp_file = tempfile.mkstemp(
+                dir=self.baseline_file.parent, prefix=f".{self.baseline_file.name}.", suffix='.tmp'
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for fingerprint, fields in self.seen.items():
+                    f.write('\t'.join((fingerprint, *fields)) + '\n')
+            os.replace(temp_file, self.baseline_file)
+            self.entries = dict(self.seen)
+            return True
+        except Exception as e:
+            print(f"Error saving issue baseline: {e}")
+            if temp_file and os.path.exists(temp_file):
+                os.unlink(temp_file)
+            return False
+
+    def _load(self) -> Dict[str, Tuple[str, str, str]]:
+        entries = {}
+        if not self.baseline_file.exists():
+            return entries
+        try:
+            with open(self.baseline_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    fields = line.rstrip('\n').split('\t')
+                    if len(fields) == 4:
+                        entries[fields[0]] = tuple(fields[1:])
+        except Exception as e:
+            print(f"Error loading issue baseline: {e}")
+        return entries
+
+    def _snippet(self, violation: Dict) -> Optional[str]:
+        """
+        Whitespace-normalized source lines covered by the violation
+        """
+        lines = self._read_lines(violation.get('file', ''))
+        if lines is None:
+            return None
+        begin = max(int(violation.get('beginline', 1)), 1)
+        end = max(int(violation.get('endline', begin)), begin)
+        return '\n'.join(re.sub(r'\s+', ' ', line).strip() for line in lines[begin - 1:end])
+
+    def _read_file_lines(self, file_path: str) -> Optional[List[str]]:
+        if not file_path:
+            return None
+        path = Path(file_path)
+        if self.source_root and not path.is_absolute():
+            path = self.source_root / path
+        try:
+            return path.read_text(encoding='utf-8', errors='replace').splitlines()
+        except OSError:
+            return None
@@ -1,71 +1,150 @@
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Iterator, List
 from xml.dom import minidom
 from src.config import CLIENT_ID, CLIENT_KEY, REALM, PROXIES
-from src.utils import FileHandler, XMLValidator
+from src.utils import FileHandler, XMLValidator, WorkspaceManager
 from .auth import TokenManager
 from .templates import XMLTemplates
-from .constants import PMD_RULE_METADATA, SEVERITY_MAPPING, PMD_SONAR_MAPPING
+from .constants import PMD_RULE_METADATA, SEVERITY_MAPPING, PMD_SONAR_MAPPING, XPATH_COST_TAG, SCHEDULER_SETTINGS
 from .ast_manager import ASTManager
 from .analyzer import PMDAnalyzer
 from .rag_helper import PMDRuleHelper
+from .xpath_linter import XPathLinter
+from .rule_index import RuleIndex
+from .compact_ast import CompactAST
+from .baseline import IssueBaseline
+from .scheduler import PipelineScheduler
+from concurrent.futures import ThreadPoolExecutor
 import json
 import requests
 import time
 
 class RuleBridge:
-    def __init__(self, json_file: str = "examples/rules/rule.json"):
+    def __init__(self, json_file: str = "examples/rules/rule.json", auto_rewrite_xpath: bool = False,
+                 profile_corpus: Optional[str] = None, profile_budget: Optional[float] = None,
+                 reuse_existing: bool = True):
         self.json_file = json_file
+        self.auto_rewrite_xpath = auto_rewrite_xpath
+        self.reuse_existing = reuse_existing
+        self.profile_corpus = profile_corpus
+        self.profile_budget = profile_budget
         self.token_manager = TokenManager()
         self.file_handler = FileHandler()
-        self.xml_validator = XMLValidator()
+        self.workspaces = WorkspaceManager()
+        self.xml_validator = XMLValidator(self.workspaces)
         self.templates = XMLTemplates()
-        self.ast_manager = ASTManager()
+        self.ast_manager = ASTManager(compact=True, workspaces=self.workspaces)
         self.analyzer = PMDAnalyzer()
+        self.xpath_linter = XPathLinter()
+        self.rule_index = RuleIndex()
+        self.scheduler = PipelineScheduler()
 
     def process(self) -> None:
         """
         Execute the complete flow to generate XML rule
         """
         try:
-            # Get valid token headers
-            headers = self.token_manager.ensure_valid_token()
-            
             # Read JSON configuration
             rule_config = self.file_handler.read_json(Path(self.json_file))
             if not rule_config:
                 return None
 
-            # Validate rule feasibility
-            helper = PMDRuleHelper()
-            feasibility = helper.validate_rule_feasibility(
-                rule_config['rule']['language'],
-                rule_config['rule']['what_to_find']
-            )
-
-            if not feasibility['feasible']:
-                print(feasibility['message'])
+            xml_file = self.generate_rule(rule_config)
+            if not xml_file:
                 return None
 
-            # Get AST from bad example
-            ast_data = self.ast_manager.analyze_examples(rule_config['rule'])
+            print(f"XML rule generated successfully: {xml_file}")
+
+        except Exception as e:
+            print(f"Error during execution: {e}")
+
+    def generate_rule(self, rule_config: Dict, xml_file: Optional[Path] = None,
+                      reuse_existing: Optional[bool] = None, ast_data: Optional[Dict] = None) -> Optional[Path]:
+        """
+        Generate and validate an XML rule from a rule configuration
+
+        Args:
+            rule_config: Rule configuration in entryPoint.json format
+            xml_file: Output path of the rule, defaults to the JSON file path with .xml suffix
+            reuse_existing: Return an equivalent library rule instead of generating one
+                (defaults to the bridge setting)
+            ast_data: Prefetched AST of the bad example, dumped here when missing
+
+        Returns:
+            XML file path if successful, None if error
+        """
+        # Get valid token headers
+        headers = self.token_manager.ensure_valid_token()
+
+        if reuse_existing is None:
+            reuse_existing = self.reuse_existing
+
+        # Validate rule feasibility
+        helper = PMDRuleHelper(self.rule_index if reuse_existing else None)
+        feasibility = helper.validate_rule_feasibility(
+            rule_config['rule']['language'],
+            rule_config['rule']['what_to_find'],
+            rule_config['rule']['name'],
+            rule_config['rule']['description']
+        )
+
+        if not feasibility['feasible']:
+            print(feasibility['message'])
+            return None
+
+        # Reuse an equivalent rule from the library instead of generating it again
+        duplicate = feasibility.get('duplicate')
+        if duplicate and duplicate['path'] and Path(duplicate['path']).exists():
+            print(feasibility['message'])
+            return Path(duplicate['path'])
+
+        # Get AST from bad example, unless it was prefetched
+        if not ast_data or not ast_data.get('ast'):
+            with self.scheduler.slot('ast'):
+                ast_data = self.ast_manager.analyze_examples(rule_config['rule'])
             if not ast_data['ast']:
+                self.scheduler.report_failure('ast')
                 return None
+            self.scheduler.report_success('ast')
 
-            # Generate XPath via AI
-            xpath_expression = self._get_xpath_from_ai(headers, rule_config, ast_data)
-            if not xpath_expression:
-                return None
+        # Generate XPath via AI
+        xpath_expression = self._get_xpath_from_ai(headers, rule_config, ast_data)
+        if not xpath_expression:
+            return None
 
-            # Generate and validate XML rule
-            xml_file = self._generate_xml_rule(rule_config, xpath_expression)
-            if not xml_file:
-                return None
+        # Generate and validate XML rule
+        return self._generate_xml_rule(rule_config, xpath_expression, ast_data, xml_file)
 
-            print(f"XML rule generated successfully: {xml_file}")
+    def generate_rules(self, rule_configs: List[Dict]) -> List[Optional[Path]]:
+        """
+        Generate many rules, dumping all example ASTs up front
 
-        except Exception as e:
-            print(f"Error during execution: {e}")
+        The bad examples of every rule are dumped with one PMD container
+        run per language and handed to each rule directly, independent of
+        the bounded AST cache. Rules are then generated concurrently under
+        the pipeline scheduler.
+
+        Args:
+            rule_configs: Rule configurations in entryPoint.json format
+
+        Returns:
+            XML file paths aligned with the input (None where generation failed)
+        """
+        with self.scheduler.slot('ast'):
+            prefetched = self.ast_manager.analyze_examples_bulk([rule_config['rule'] for rule_config in rule_configs])
+
+        def generate(rule_config: Dict, ast_data: Dict) -> Optional[Path]:
+            try:
+                xml_file = Path(self.json_file).with_name(f"{rule_config['rule']['name']}.xml")
+                return self.generate_rule(rule_config, xml_file, ast_data=ast_data)
+            except Exception as e:
+                print(f"Error generating rule {rule_config['rule'].get('name')}: {e}")
+                return None
+
+        # Workers only bound the pool, each stage is throttled by the scheduler
+        max_workers = SCHEDULER_SETTINGS['STAGES']['ai']['maximum']
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(generate, rule_configs, prefetched))
 
     def map_pmd_severity_to_sonar(self, pmd_severity):
         """
@@ -136,20 +215,26 @@ class RuleBridge:
             "scope": "MAIN"
         }
 
+    def build_sonar_rules(self, rules) -> Dict:
+        """
+        Build rules document in Sonarqube 9.9 LTS format
+        """
+        return {
+            "rules": [self.create_sonar_rule(rule) for rule in rules],
+            "metadata": {
+                "formatVersion": "9.9",
+                "repository": "pmd-to-sonar",
+                "name": "PMD Rules converted to Sonarqube",
+                "language": "java"
+            }
+        }
+
     def save_sonar_rules(self, rules, output_file="rules.json"):
         """
         Saves rules in Sonarqube 9.9 LTS format
         """
         try:
-            sonar_rules = {
-                "rules": [self.create_sonar_rule(rule) for rule in rules],
-                "metadata": {
-                    "formatVersion": "9.9",
-                    "repository": "pmd-to-sonar",
-                    "name": "PMD Rules converted to Sonarqube",
-                    "language": "java"
-                }
-            }
+            sonar_rules = self.build_sonar_rules(rules)
             
             with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(sonar_rules, f, indent=2, ensure_ascii=False)
@@ -160,36 +245,60 @@ class RuleBridge:
             print(f"Error saving rules file: {str(e)}")
             return None
 
-    def convert_pmd_to_sonar(self, pmd_report):
+    def create_sonar_issue(self, violation: Dict) -> Dict:
+        """
+        Converts a single PMD violation to a Sonarqube external issue
+        """
+        return {
+            "engineId": "pmd",
+            "ruleId": violation.get('rule', 'unknown'),
+            "severity": self.map_pmd_severity_to_sonar(violation.get('priority')),
+            "type": "CODE_SMELL",
+            "primaryLocation": {
+                "message": violation.get('description', ''),
+                "filePath": violation.get('file', ''),
+                "textRange": {
+                    "startLine": violation.get('beginline', 1),
+                    "endLine": violation.get('endline', 1),
+                    "startColumn": violation.get('begincolumn', 1),
+                    "endColumn": violation.get('endcolumn', 1)
+                }
+            }
+        }
+
+    def iter_sonar_issues(self, violations: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Lazily convert PMD violations so large reports can be streamed
+        """
+        for violation in violations:
+            yield self.create_sonar_issue(violation)
+
+    def convert_pmd_to_sonar(self, pmd_report, baseline: Optional[IssueBaseline] = None,
+                             update_baseline: bool = False):
         """
         Converts PMD report in SARIF format to Sonarqube JSON
+
+        With a baseline, only violations missing from it are emitted and
+        baseline issues absent from the report are listed under 'fixed'.
         """
-        sonar_issues = []
-        
         try:
-            for violation in pmd_report.get('violations', []):
-                issue = {
-                    "engineId": "pmd",
-                    "ruleId": violation.get('rule', 'unknown'),
-                    "severity": self.map_pmd_severity_to_sonar(violation.get('priority')),
-                    "type": "CODE_SMELL",
-                    "primaryLocation": {
-                        "message": violation.get('description', ''),
-                        "filePath": violation.get('file', ''),
-                        "textRange": {
-                            "startLine": violation.get('beginline', 1),
-                            "endLine": violation.get('endline', 1),
-                            "startColumn": violation.get('begincolumn', 1),
-                            "endColumn": violation.get('endcolumn', 1)
-                        }
-                    }
-                }
-                sonar_issues.append(issue)
-            
-            return {
+            # PMD 7 nests violations under files[], with the path in 'filename'
+            violations = self.analyzer.iter_violations(pmd_report)
+            if baseline:
+                violations = baseline.filter_new(violations)
+
+            sonar_issues = list(self.iter_sonar_issues(violations))
+            result = {
                 "issues": sonar_issues,
                 "total": len(sonar_issues)
             }
+
+            if baseline:
+                result["fixed"] = baseline.fixed()
+                if update_baseline:
+                    baseline.save()
+            
+            return result
             
         except Exception as e:
             print(f"Error converting report: {str(e)}")
@@ -210,19 +319,27 @@ class RuleBridge:
         
         while (time.time() - start_time) < 300:  # 5 minutes default timeout
             try:
+                poll_start = time.perf_counter()
                 response = requests.get(
                     f"{self.token_manager.get_url}/{response_id}",
                     headers=headers,
                     proxies=PROXIES
                 )
+                self.scheduler.report_latency('ai', time.perf_counter() - poll_start)
+                if response.status_code >= 400:
+                    # Pending 202 polls only feed latency, success is counted on completion
+                    self.scheduler.report_status('ai', response.status_code)
                 
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('status') == 'completed':
+                        self.scheduler.report_success('ai')
                         return data
                     elif data.get('status') == 'failed':
                         print(f"AI processing failed: {data.get('error', 'Unknown error')}")
                         return None
+                elif response.status_code == 429:  # Throttled, keep polling more slowly
+                    time.sleep(5)
                 elif response.status_code != 202:  # 202 means still processing
                     print(f"Error checking AI status: {response.status_code}")
                     return None
@@ -239,6 +356,9 @@ class RuleBridge:
     def read_ast_file(self, file_path: str = "code_ast.json") -> Optional[Dict]:
         """
         Read and parse the AST file generated by PMD
+
+        The whole JSON dump is loaded into nested dicts; for large sources
+        use ASTManager.generate_compact_ast, which streams PMD's XML dump.
         """
         try:
             with open(file_path, 'r') as f:
@@ -293,11 +413,15 @@ class RuleBridge:
             XPath expression if successful, None if error
         """
         try:
-            # Get AST from bad example
-            ast_data = self.ast_manager.analyze_examples(rule_config['rule'])
+            # Get AST from bad example, unless the caller already has it
+            if not ast_data or not ast_data.get('ast'):
+                ast_data = self.ast_manager.analyze_examples(rule_config['rule'])
             if not ast_data['ast']:
                 return None
 
+            ast = ast_data['ast']
+            ast_text = ast.render() if isinstance(ast, CompactAST) else json.dumps(ast, indent=2)
+
             # Build enhanced XPath prompt with example AST
             xpath_prompt = f"""
             Create a PMD XPath expression that implements the following rule:
@@ -310,7 +434,7 @@ class RuleBridge:
             {rule_config['rule']['examples']['bad']}
             
             AST of problem code:
-            {json.dumps(ast_data['ast'], indent=2)}
+            {ast_text}
             
             Reference code (correct implementation):
             {rule_config['rule']['examples']['good']}
@@ -323,28 +447,35 @@ class RuleBridge:
             # Get engine-specific payload
             xpath_payload = self.get_ai_payload(xpath_prompt, engine="stackspot")
             
-            # Initial request to AI
-            initial_response = requests.post(
-                self.token_manager.post_url,
-                headers=headers,
-                json=xpath_payload,
-                proxies=PROXIES
-            )
-            
-            if initial_response.status_code != 202:  # 202 means accepted for processing
-                print(f"Error submitting to AI: {initial_response.status_code}")
-                return None
-            
-            # Get request ID and wait for completion
-            request_id = initial_response.json().get('request_id')
-            if not request_id:
-                print("No request ID received from AI")
-                return None
-            
-            # Wait for AI processing
-            ai_response = self.wait_for_ai_response(request_id, headers)
-            if not ai_response:
-                return None
+            with self.scheduler.slot('ai'):
+                # Initial request to AI, retried while throttled
+                for attempt in range(SCHEDULER_SETTINGS['AI_SUBMIT_RETRIES']):
+                    initial_response = requests.post(
+                        self.token_manager.post_url,
+                        headers=headers,
+                        json=xpath_payload,
+                        proxies=PROXIES
+                    )
+                    if initial_response.status_code != 429 and initial_response.status_code < 500:
+                        break
+                    self.scheduler.report_status('ai', initial_response.status_code)
+                    if attempt + 1 < SCHEDULER_SETTINGS['AI_SUBMIT_RETRIES']:
+                        time.sleep(2 ** attempt)
+                
+                if initial_response.status_code != 202:  # 202 means accepted for processing
+                    print(f"Error submitting to AI: {initial_response.status_code}")
+                    return None
+                
+                # Get request ID and wait for completion
+                request_id = initial_response.json().get('request_id')
+                if not request_id:
+                    print("No request ID received from AI")
+                    return None
+                
+                # Wait for AI processing
+                ai_response = self.wait_for_ai_response(request_id, headers)
+                if not ai_response:
+                    return None
             
             xpath_expression = ai_response['result']['choices'][0]['text'].strip()
             
@@ -354,40 +485,156 @@ class RuleBridge:
             print(f"Error getting XPath from AI: {e}")
             return None
 
-    def _generate_xml_rule(self, rule_config: Dict, xpath_expression: str) -> Optional[Path]:
+    def _render_rule_xml(self, rule_config: Dict, xpath_expression: str, cost_class: str) -> str:
+        """
+        Render the formatted PMD ruleset XML for a single rule
+        """
+        rule_xml = self.templates.RULE_TEMPLATE.format(
+            name=rule_config['rule']['name'],
+            language=rule_config['rule']['language'],
+            message=rule_config['rule']['description'],
+            rule_class=PMD_RULE_METADATA['RULE_CLASS'],
+            severity_tag=SEVERITY_MAPPING[rule_config['rule']['severity']],
+            cost_tag=XPATH_COST_TAG.format(cost_class=cost_class),
+            severity=rule_config['rule']['severity'],
+            xpath=xpath_expression
+        )
+
+        complete_xml = f"{self.templates.XML_HEADER}{rule_xml}{self.templates.XML_FOOTER}"
+
+        # Parse and format XML
+        xml_dom = minidom.parseString(complete_xml)
+        return xml_dom.toprettyxml(indent="  ")
+
+    def _rewrite_xpath(self, rule_config: Dict, xpath_expression: str, xml_file: Path,
+                       ast_data: Optional[Dict] = None) -> Optional[str]:
+        """
+        Anchor descendant scans of an XPath expression
+
+        The rewritten expression is kept only if it still validates
+        against the rule examples.
+
+        Args:
+            rule_config: Rule configuration
+            xpath_expression: XPath expression returned by the AI
+            xml_file: Final XML rule path, used to place the candidate rule
+            ast_data: AST data of the bad example
+
+        Returns:
+            Rewritten XPath expression if valid, None otherwise
+        """
+        rule = rule_config['rule']
+        node_paths = self.xpath_linter.collect_node_paths(
+            [rule['examples']['good'], rule['examples']['bad']],
+            rule['language'],
+            ast_data.get('ast') if ast_data else None
+        )
+        rewritten = self.xpath_linter.suggest_anchored(xpath_expression, node_paths)
+        if not rewritten:
+            return None
+
+        print(f"Suggested anchored XPath: {rewritten}")
+        candidate_file = xml_file.with_name(f"{xml_file.stem}.anchored.xml")
+        try:
+            candidate_xml = self._render_rule_xml(
+                rule_config, rewritten, self.xpath_linter.lint(rewritten)['cost_class']
+            )
+            if not self.file_handler.write_xml(candidate_xml, candidate_file):
+                return None
+
+            with self.scheduler.slot('validation'):
+                valid = self.xml_validator.validate_against_examples(candidate_file, rule['language'], rule['examples'])
+            if valid:
+                return rewritten
+
+            print("Anchored XPath failed validation against examples - keeping original")
+            return None
+        finally:
+            candidate_file.unlink(missing_ok=True)
+
+    def _profile_rule(self, xml_file: Path, language: str) -> bool:
+        """
+        Profile rule against the reference corpus and enforce the cost budget
+
+        Args:
+            xml_file: Generated XML rule
+            language: Programming language of the rule
+
+        Returns:
+            True if the rule is kept, False if rejected for exceeding the budget
+        """
+        with self.scheduler.slot('validation'):
+            profile = self.analyzer.profile(xml_file, Path(self.profile_corpus), language, self.profile_budget)
+        if not profile:
+            # Profiling failures say nothing about the rule's cost, keep it
+            print("Warning: rule could not be profiled, budget not enforced")
+            return True
+
+        self.analyzer.save_profile(xml_file, profile)
+        for rule in profile['rules']:
+            print(f"Rule {rule['name']}: {rule['execution_time']}s, {rule['violations']} violations on corpus")
+
+        if not profile['within_budget']:
+            print(f"Rule rejected - execution time exceeds budget of {profile['budget_seconds']}s")
+            xml_file.unlink(missing_ok=True)
+            return False
+
+        return True
+
+    def _generate_xml_rule(self, rule_config: Dict, xpath_expression: str,
+                           ast_data: Optional[Dict] = None, xml_file: Optional[Path] = None) -> Optional[Path]:
         """
         Generate and validate XML rule
         
         Args:
             rule_config: Rule configuration
             xpath_expression: XPath expression
+            ast_data: AST data of the bad example
+            xml_file: Output path of the rule
             
         Returns:
             XML file path if successful, None if error
         """
         try:
-            # Build XML using templates and constants
-            rule_xml = self.templates.RULE_TEMPLATE.format(
-                name=rule_config['rule']['name'],
-                language=rule_config['rule']['language'],
-                message=rule_config['rule']['description'],
-                rule_class=PMD_RULE_METADATA['RULE_CLASS'],
-                severity_tag=SEVERITY_MAPPING[rule_config['rule']['severity']],
-                severity=rule_config['rule']['severity'],
-                xpath=xpath_expression
-            )
-            
-            complete_xml = f"{self.templates.XML_HEADER}{rule_xml}{self.templates.XML_FOOTER}"
-            
-            # Parse and format XML
-            xml_dom = minidom.parseString(complete_xml)
-            pretty_xml = xml_dom.toprettyxml(indent="  ")
+            xml_file = Path(xml_file) if xml_file else Path(self.json_file).with_suffix('.xml')
+
+            # Estimate XPath cost and report costly descendant scans
+            lint = self.xpath_linter.lint(xpath_expression)
+            for finding in lint['findings']:
+                print(f"XPath warning: {finding['message']}")
+
+            if self.auto_rewrite_xpath and lint['findings']:
+                rewritten = self._rewrite_xpath(rule_config, xpath_expression, xml_file, ast_data)
+                if rewritten:
+                    xpath_expression = rewritten
+                    lint = self.xpath_linter.lint(rewritten)
+
+            print(f"XPath estimated cost class: {lint['cost_class']}")
+            pretty_xml = self._render_rule_xml(rule_config, xpath_expression, lint['cost_class'])
             
             # Save formatted XML rule
-            xml_file = Path(self.json_file).with_suffix('.xml')
             if self.file_handler.write_xml(pretty_xml, xml_file):
                 # Validate generated XML by testing it
-                if self.xml_validator.validate_pmd_rule(xml_file, rule_config['rule']['language']):
+                with self.scheduler.slot('validation'):
+                    valid = self.xml_validator.validate_pmd_rule(xml_file, rule_config['rule']['language'])
+                if valid:
+                    if self.profile_corpus and not self._profile_rule(xml_file, rule_config['rule']['language']):
+                        return None
+                    # Index the library copy, xml_file may live in a job directory
+                    library_file = self.rule_index.store(
+                        xml_file,
+                        rule_config['rule']['name'],
+                        rule_config['rule']['language']
+                    )
+                    if library_file:
+                        self.rule_index.add(
+                            rule_config['rule']['name'],
+                            rule_config['rule']['language'],
+                            xpath_expression,
+                            # Same field add_ruleset indexes: the rule message
+                            rule_config['rule']['description'],
+                            library_file
+                        )
                     print(f"XML rule successfully generated and validated: {xml_file}")
                     return xml_file
                 else:
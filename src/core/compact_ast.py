@@ -0,0 +1,259 @@
+from array import array
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+import xml.etree.ElementTree as ET
+import json
+
+NO_NODE = -1
+KIND_KEYS = ('xpathName', 'name', 'kind', 'type')
+
+
+class StringPool:
+    """
+    Interned string table shared by node kinds and attributes
+    """
+    __slots__ = ('strings', 'ids')
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        self.strings = list(strings or [])
+        self.ids = {value: index for index, value in enumerate(self.strings)}
+
+    def intern(self, value: str) -> int:
+        index = self.ids.get(value)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(value)
+            self.ids[value] = index
+        return index
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.ids.get(value)
+
+    def __getitem__(self, index: int) -> str:
+        return self.strings[index]
+
+
+class CompactAST:
+    """
+    Array-backed AST with parent/child/kind tables and an interned string pool
+
+    Nodes are integer ids in document order, node 0 being the root.
+    Attributes of a node are stored as (key, value) string ids in a
+    contiguous slice of the attribute tables.
+    """
+    __slots__ = ('pool', 'kinds', 'parents', 'first_child', 'next_sibling', 'last_child',
+                 'attr_start', 'attr_keys', 'attr_values', '_kind_index')
+
+    def __init__(self):
+        self.pool = StringPool()
+        self.kinds = array('i')
+        self.parents = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.last_child = array('i')
+        self.attr_start = array('i')
+        self.attr_keys = array('i')
+        self.attr_values = array('i')
+        self._kind_index = None
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __bool__(self) -> bool:
+        return len(self.kinds) > 0
+
+    def add_node(self, kind: str, parent: int = NO_NODE, attributes: Optional[Dict[str, str]] = None) -> int:
+        """
+        Append a node as the last child of parent and return its id
+        """
+        node = len(self.kinds)
+        self.kinds.append(self.pool.intern(kind))
+        self.parents.append(parent)
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self.last_child.append(NO_NODE)
+        self.attr_start.append(len(self.attr_keys))
+
+        for key, value in (attributes or {}).items():
+            self.attr_keys.append(self.pool.intern(key))
+            self.attr_values.append(self.pool.intern(str(value)))
+
+        if parent != NO_NODE:
+            previous = self.last_child[parent]
+            if previous == NO_NODE:
+                self.first_child[parent] = node
+            else:
+                self.next_sibling[previous] = node
+            self.last_child[parent] = node
+
+        self._kind_index = None
+        return node
+
+    @classmethod
+    def from_xml_stream(cls, stream: IO) -> 'CompactAST':
+        """
+        Build incrementally from PMD 'ast-dump --format xml' output
+
+        Elements are released as soon as they are closed, so the
+        parsed XML tree never lives in memory as a whole.
+        """
+        tree = cls()
+        stack = []
+
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                parent = stack[-1] if stack else NO_NODE
+                stack.append(tree.add_node(element.tag, parent, element.attrib))
+            else:
+                stack.pop()
+                element.clear()
+
+        return tree
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CompactAST':
+        """
+        Build from a dict-of-dicts AST (nodes with a kind key and 'children')
+        """
+        tree = cls()
+        pending = [(data, NO_NODE)]
+
+        while pending:
+            node, parent = pending.pop()
+            if not isinstance(node, dict):
+                continue
+            kind_key = next((key for key in KIND_KEYS if isinstance(node.get(key), str)), None)
+            kind = node[kind_key] if kind_key else 'Node'
+            attributes = {
+                key: value for key, value in node.items()
+                if key not in ('children', kind_key) and not isinstance(value, (dict, list))
+            }
+            node_id = tree.add_node(kind, parent, attributes)
+            # Reverse so children are popped, and numbered, in document order
+            pending.extend((child, node_id) for child in reversed(node.get('children', [])))
+
+        return tree
+
+    @classmethod
+    def loads(cls, text: str) -> 'CompactAST':
+        """
+        Restore from the serialized table form produced by dumps()
+        """
+        data = json.loads(text)
+        tree = cls()
+        tree.pool = StringPool(data['strings'])
+        for name in ('kinds', 'parents', 'first_child', 'next_sibling', 'last_child',
+                     'attr_start', 'attr_keys', 'attr_values'):
+            setattr(tree, name, array('i', data[name]))
+        return tree
+
+    def dumps(self) -> str:
+        """
+        Serialize the tables (not a nested tree) for caching
+        """
+        data = {'strings': self.pool.strings}
+        for name in ('kinds', 'parents', 'first_child', 'next_sibling', 'last_child',
+                     'attr_start', 'attr_keys', 'attr_values'):
+            data[name] = getattr(self, name).tolist()
+        return json.dumps(data, separators=(',', ':'))
+
+    def kind(self, node: int) -> str:
+        return self.pool[self.kinds[node]]
+
+    def parent(self, node: int) -> Optional[int]:
+        parent = self.parents[node]
+        return None if parent == NO_NODE else parent
+
+    def children(self, node: int) -> Iterator[int]:
+        child = self.first_child[node]
+        while child != NO_NODE:
+            yield child
+            child = self.next_sibling[child]
+
+    def attributes(self, node: int) -> Dict[str, str]:
+        end = self.attr_start[node + 1] if node + 1 < len(self.kinds) else len(self.attr_keys)
+        return {
+            self.pool[self.attr_keys[i]]: self.pool[self.attr_values[i]]
+            for i in range(self.attr_start[node], end)
+        }
+
+    def iter_subtree(self, node: int = 0) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (node, depth) pairs of a subtree in document order
+        """
+        if not self:
+            return
+        pending = [(node, 0)]
+        while pending:
+            current, depth = pending.pop()
+            yield current, depth
+            pending.extend((child, depth + 1) for child in reversed(list(self.children(current))))
+
+    def subtree_size(self, node: int = 0) -> int:
+        return sum(1 for _ in self.iter_subtree(node))
+
+    def find(self, kind: str) -> List[int]:
+        """
+        Return all nodes of a given kind, using a lazily built kind index
+        """
+        kind_id = self.pool.lookup(kind)
+        if kind_id is None:
+            return []
+        if self._kind_index is None:
+            self._kind_index = {}
+            for node, node_kind in enumerate(self.kinds):
+                self._kind_index.setdefault(node_kind, []).append(node)
+        return self._kind_index.get(kind_id, [])
+
+    def path(self, node: int) -> str:
+        """
+        Absolute kind path of a node, e.g. /CompilationUnit/ClassDeclaration
+        """
+        steps = []
+        while node != NO_NODE:
+            steps.append(self.kind(node))
+            node = self.parents[node]
+        return '/' + '/'.join(reversed(steps))
+
+    def node_paths(self) -> Dict[str, List[str]]:
+        """
+        Map every node kind to the sorted absolute paths it appears under
+        """
+        paths = {}
+        for node in range(len(self.kinds)):
+            paths.setdefault(self.kind(node), set()).add(self.path(node))
+        return {kind: sorted(found) for kind, found in paths.items()}
+
+    def kind_counts(self, node: int = 0) -> Dict[str, int]:
+        """
+        Count node kinds in a subtree, used to compare examples
+        """
+        counts = {}
+        for current, _ in self.iter_subtree(node):
+            kind = self.kind(current)
+            counts[kind] = counts.get(kind, 0) + 1
+        return counts
+
+    def to_dict(self, node: int = 0, max_depth: Optional[int] = None) -> Dict:
+        """
+        Expand a subtree back into nested dicts
+        """
+        result = dict(self.attributes(node), kind=self.kind(node))
+        if max_depth is None or max_depth > 0:
+            next_depth = None if max_depth is None else max_depth - 1
+            children = [self.to_dict(child, next_depth) for child in self.children(node)]
+            if children:
+                result['children'] = children
+        return result
+
+    def render(self, node: int = 0, max_nodes: Optional[int] = None) -> str:
+        """
+        Render a subtree as indented text for AI prompts
+        """
+        lines = []
+        for count, (current, depth) in enumerate(self.iter_subtree(node)):
+            if max_nodes is not None and count >= max_nodes:
+                lines.append('  ' * depth + '...')
+                break
+            attributes = ' '.join(f'{key}="{value}"' for key, value in self.attributes(current).items())
+            lines.append('  ' * depth + (f"{self.kind(current)} {attributes}" if attributes else self.kind(current)))
+        return '\n'.join(lines)
@@ -7,6 +7,24 @@ PMD_RULE_METADATA = {
     'RULE_CLASS': 'net.sourceforge.pmd.lang.rule.XPathRule'
 }
 
+# Source file extension per PMD language
+LANGUAGE_EXTENSIONS = {
+    'java': '.java',
+    'python': '.py',
+    'javascript': '.js',
+    'typescript': '.ts',
+    'ruby': '.rb',
+    'go': '.go',
+    'cpp': '.cpp',
+    'c': '.c',
+    'php': '.php',
+    'scala': '.scala',
+    'kotlin': '.kt',
+    'xml': '.xml',
+    'yaml': '.yml',
+    'json': '.json'
+}
+
 # Mapping between PMD severity levels and Sonarqube format
 PMD_SONAR_MAPPING = {
     # PMD severity to Sonar severity
@@ -53,4 +71,89 @@ SEVERITY_MAPPING = {
     3: '[CODE_SMELL][20]',
     4: '[MINOR][10]',
     5: '[INFO][5]'
-} 
\ No newline at end of file
+} 
+
+# XPath cost estimation weights per descendant scan kind
+XPATH_COST_WEIGHTS = {
+    'full-tree-scan': 3,
+    'descendant-step': 1,
+    'context-descendant': 1,
+    'nested': 2,
+    'wildcard': 2
+}
+
+# Upper score bound of each XPath cost class
+XPATH_COST_THRESHOLDS = (
+    ('LOW', 0),
+    ('MEDIUM', 3)
+)
+
+# Cost class tag appended to the rule description
+XPATH_COST_TAG = '[COST:{cost_class}]'
+
+# Rule profiling against a reference corpus
+PMD_PROFILE = {
+    'CORPUS_DIR': 'corpus',
+    'BUDGET_SECONDS': 5.0
+}
+
+# Local HTTP service defaults
+SERVICE_SETTINGS = {
+    'HOST': '127.0.0.1',
+    'PORT': 8765,
+    'MAX_WORKERS': 4,
+    'MAX_QUEUE': 32,
+    # JSON bodies are parsed in memory; larger reports must be sent as NDJSON
+    'MAX_JSON_BODY': 64 * 1024 * 1024,
+    # Files saved on request are confined to this directory
+    'OUTPUT_DIR': 'service_output'
+}
+
+# Generated rule library index
+RULE_INDEX = {
+    'DIR': '.rule_index',
+    # Indexed rules are copied here so their paths outlive job directories
+    'LIBRARY_DIR': '.rule_index/library',
+    'SIMILARITY_THRESHOLD': 0.8
+}
+
+# Scratch workspaces for PMD inputs
+WORKSPACE_SETTINGS = {
+    'USE_TMPFS': False,
+    'TMPFS_DIR': '/dev/shm',
+    'POOL_SIZE': 4
+}
+
+# Repository scans with the generated rules
+PMD_SCAN = {
+    'CACHE_DIR': '.pmd_cache'
+}
+
+# Issue baseline used to emit only new or fixed issues
+ISSUE_BASELINE = {
+    'FILE': '.sonar_baseline.tsv',
+    # Baselines named by service clients are confined to this directory
+    'SERVICE_DIR': '.sonar_baselines',
+    'FILE_CACHE_SIZE': 256
+}
+
+# In-memory AST cache shared by bulk prefetch and rule generation
+AST_CACHE = {
+    'MEMORY_ENTRIES': 256
+}
+
+# Adaptive concurrency limits per pipeline stage
+SCHEDULER_SETTINGS = {
+    'STAGES': {
+        'ai': {'initial': 2, 'minimum': 1, 'maximum': 8},
+        'ast': {'initial': 2, 'minimum': 1, 'maximum': 4},
+        'validation': {'initial': 2, 'minimum': 1, 'maximum': 4}
+    },
+    'MEMORY_BOUND_STAGES': ('ast', 'validation'),
+    'MEMORY_MIN_AVAILABLE': 0.15,
+    'MEMORY_CHECK_INTERVAL': 2.0,
+    'LATENCY_FACTOR': 2.0,
+    'LATENCY_SMOOTHING': 0.2,
+    'BACKOFF_COOLDOWN': 5.0,
+    'AI_SUBMIT_RETRIES': 3
+}
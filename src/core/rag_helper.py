@@ -1,9 +1,11 @@
 from pathlib import Path
 from typing import Dict, Optional, List
 import json
+from .rule_index import RuleIndex
 
 class PMDRuleHelper:
-    def __init__(self):
+    def __init__(self, rule_index: Optional[RuleIndex] = None):
+        self.rule_index = rule_index
         self.rules_db = {
             'java': self._load_rules('java'),
             'xml': self._load_rules('xml'),
@@ -22,10 +24,24 @@ class PMDRuleHelper:
             print(f"Error loading rules for {language}: {e}")
             return {}
 
-    def validate_rule_feasibility(self, language: str, description: str) -> Dict:
+    def validate_rule_feasibility(self, language: str, description: str, name: Optional[str] = None,
+                                  message: Optional[str] = None) -> Dict:
         """
         Check if PMD can handle the requested rule
+
+        When a rule index is available, an equivalent existing rule is
+        returned under 'duplicate' so generation can be skipped. The index
+        is searched by the rule message, falling back to description.
         """
+        if self.rule_index:
+            duplicate = self.rule_index.find_duplicate(language, message or description, name)
+            if duplicate:
+                return {
+                    'feasible': True,
+                    'duplicate': duplicate,
+                    'message': f"Equivalent rule already exists: {duplicate['name']} ({duplicate['path']})"
+                }
+
         if language not in self.rules_db:
             return {
                 'feasible': False,
@@ -0,0 +1,214 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import xml.etree.ElementTree as ET
+import json
+import re
+import shutil
+import threading
+import unicodedata
+
+from .constants import RULE_INDEX
+
+_TOKEN_PATTERN = re.compile(r'\w[\w.-]*')
+_STOPWORDS = {
+    'the', 'and', 'for', 'with', 'that', 'this', 'must', 'should', 'check', 'contains', 'contain', 'has', 'have', 'are',
+    'que', 'para', 'com', 'uma', 'dos', 'das', 'deve', 'devem', 'conter', 'contém', 'verificar', 'verifica', 'possuir', 'tem'
+}
+# Kept as tokens regardless of length, a rule and its negation are never duplicates
+_NEGATIONS = {
+    'no', 'not', 'never', 'none', 'without',
+    'não', 'nao', 'nunca', 'sem', 'nenhum', 'nenhuma', 'nem'
+}
+
+
+class RuleIndex:
+    """
+    On-disk index of generated rules for lookup and deduplication
+
+    Entries are appended to a JSON Lines file as rules are emitted and
+    loaded into in-memory lookup tables by name, language, normalized
+    XPath and description tokens.
+    """
+
+    def __init__(self, index_dir: Optional[str] = None, library_dir: Optional[str] = None):
+        self.index_dir = Path(index_dir or RULE_INDEX['DIR'])
+        self.index_file = self.index_dir / 'rules.jsonl'
+        self.library_dir = Path(library_dir or RULE_INDEX['LIBRARY_DIR'])
+        self.entries = []
+        self.by_name = {}
+        self.by_xpath = {}
+        self.by_token = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def add(self, name: str, language: str, xpath: str, description: str, path: Optional[Path] = None) -> Dict:
+        """
+        Add a rule to the index and persist it
+
+        Args:
+            name: Rule name
+            language: Rule language
+            xpath: XPath expression of the rule
+            description: Rule description, the message of the emitted rule
+            path: Path of the emitted rule file
+
+        Returns:
+            Indexed entry
+        """
+        entry = {
+            'name': name,
+            'language': language.lower(),
+            'xpath': self.normalize_xpath(xpath),
+            'tokens': sorted(self.tokenize(description)),
+            'description': description,
+            'path': str(path) if path else None
+        }
+
+        with self._lock:
+            try:
+                self.index_dir.mkdir(parents=True, exist_ok=True)
+                with open(self.index_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            except Exception as e:
+                print(f"Error writing rule index: {e}")
+
+            self._insert(entry)
+        return entry
+
+    def store(self, xml_file: Path, name: str, language: str) -> Optional[Path]:
+        """
+        Copy an emitted rule into the library directory
+
+        Rules are often written to short-lived job directories; index the
+        returned library path so lookups keep pointing at an existing file.
+
+        Returns:
+            Library path of the rule, None if error
+        """
+        library_file = self.library_dir / language.lower() / f"{name}.xml"
+        try:
+            library_file.parent.mkdir(parents=True, exist_ok=True)
+            if Path(xml_file).resolve() != library_file.resolve():
+                shutil.copyfile(xml_file, library_file)
+            return library_file
+        except Exception as e:
+            print(f"Error storing rule in library: {e}")
+            return None
+
+    def add_ruleset(self, xml_file: Path) -> List[Dict]:
+        """
+        Index every XPath rule of an existing PMD ruleset file
+        """
+        added = []
+        try:
+            root = ET.parse(xml_file).getroot()
+        except Exception as e:
+            print(f"Error reading ruleset {xml_file}: {e}")
+            return added
+
+        for rule in root.iter():
+            if rule.tag.split('}')[-1] != 'rule' or not rule.get('name'):
+                continue
+            xpath = next(
+                (value.text or '' for value in rule.iter() if value.tag.split('}')[-1] == 'value'),
+                ''
+            )
+            added.append(self.add(
+                rule.get('name'),
+                rule.get('language', ''),
+                xpath,
+                rule.get('message', ''),
+                Path(xml_file)
+            ))
+        return added
+
+    def find_duplicate(self, language: str, description: str, name: Optional[str] = None,
+                       xpath: Optional[str] = None) -> Optional[Dict]:
+        """
+        Find an existing rule equivalent to the requested one
+
+        Matches by name with the same normalized description, normalized
+        XPath, or description tokens overlapping at least the configured
+        similarity threshold. Negations must agree for a token match.
+
+        Returns:
+            Matching entry, or None if no near-duplicate exists
+        """
+        language = language.lower()
+        tokens = self.tokenize(description)
+
+        # Same name with a changed description is a redefinition, regenerate it
+        entry = self.by_name.get(name) if name else None
+        if entry and entry['language'] == language and set(entry['tokens']) == tokens:
+            return entry
+
+        if xpath:
+            match = self.by_xpath.get((language, self.normalize_xpath(xpath)))
+            if match:
+                return match
+
+        if not tokens:
+            return None
+        negations = tokens & _NEGATIONS
+
+        # Count shared tokens only for entries reachable from the query tokens
+        overlaps = {}
+        for token in tokens:
+            for position in self.by_token.get(token, ()):
+                overlaps[position] = overlaps.get(position, 0) + 1
+
+        best, best_score = None, 0.0
+        for position, shared in overlaps.items():
+            entry = self.entries[position]
+            if entry['language'] != language or entry['name'] == name:
+                continue
+            if set(entry['tokens']) & _NEGATIONS != negations:
+                continue
+            score = shared / len(tokens | set(entry['tokens']))
+            if score > best_score:
+                best, best_score = entry, score
+
+        return best if best_score >= RULE_INDEX['SIMILARITY_THRESHOLD'] else None
+
+    def normalize_xpath(self, xpath: str) -> str:
+        """
+        Normalize XPath whitespace and quoting outside string literals
+        """
+        parts = re.split(r'("[^"]*"|\'[^\']*\')', xpath.strip())
+        normalized = []
+        for i, part in enumerate(parts):
+            if i % 2:
+                normalized.append("'" + part[1:-1] + "'")
+            else:
+                normalized.append(re.sub(r'\s+', ' ', part))
+        return re.sub(r'\s*([\[\]()/,=|])\s*', r'\1', ''.join(normalized))
+
+    def tokenize(self, text: str) -> Set[str]:
+        """
+        Split a description into lowercase content tokens
+        """
+        text = unicodedata.normalize('NFC', text).lower()
+        return {
+            token.strip('.-_') for token in _TOKEN_PATTERN.findall(text)
+            if token in _NEGATIONS or (len(token) > 2 and token not in _STOPWORDS)
+        }
+
+    def _load(self) -> None:
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._insert(json.loads(line))
+        except Exception as e:
+            print(f"Error loading rule index: {e}")
+
+    def _insert(self, entry: Dict) -> None:
+        position = len(self.entries)
+        self.entries.append(entry)
+        # Later entries replace earlier ones with the same name or XPath
+        self.by_name[entry['name']] = entry
+        self.by_xpath[(entry['language'], entry['xpath'])] = entry
+        for token in entry['tokens']:
+            self.by_token.setdefault(token, []).append(position)
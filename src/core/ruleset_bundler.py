@@ -0,0 +1,121 @@
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+import xml.etree.ElementTree as ET
+import hashlib
+import json
+
+from .constants import PMD_RULE_METADATA, LANGUAGE_EXTENSIONS
+
+RULESET_NS = PMD_RULE_METADATA['RULESET_XMLNS']
+XSI_NS = PMD_RULE_METADATA['RULESET_XSI']
+
+
+class RulesetBundler:
+    """
+    Groups emitted rules into one PMD ruleset per language with a manifest
+
+    Scanning with per-language bundles lets each PMD pass parse only the
+    files of a language that actually has active rules.
+    """
+
+    MANIFEST_NAME = 'manifest.json'
+
+    def __init__(self):
+        ET.register_namespace('', RULESET_NS)
+        ET.register_namespace('xsi', XSI_NS)
+
+    def group_rules(self, rule_files: Iterable[Path]) -> Dict[str, Dict[str, ET.Element]]:
+        """
+        Read rules from ruleset files and group them by language
+
+        Returns:
+            Mapping of language to rules keyed by name (later files win)
+        """
+        groups = {}
+        for rule_file in rule_files:
+            try:
+                root = ET.parse(rule_file).getroot()
+            except Exception as e:
+                print(f"Error reading ruleset {rule_file}: {e}")
+                continue
+
+            for rule in root:
+                if rule.tag.split('}')[-1] != 'rule' or not rule.get('name'):
+                    continue
+                language = rule.get('language', '').lower()
+                if not language:
+                    print(f"Skipping rule without language: {rule.get('name')}")
+                    continue
+                groups.setdefault(language, {})[rule.get('name')] = rule
+
+        return groups
+
+    def bundle(self, rule_files: Iterable[Path], output_dir: str = 'bundles') -> Optional[Path]:
+        """
+        Write one ruleset per language and the manifest describing them
+
+        Args:
+            rule_files: Generated PMD ruleset files
+            output_dir: Directory for the bundles and the manifest
+
+        Returns:
+            Manifest path if successful, None if error
+        """
+        output_path = Path(output_dir)
+        try:
+            output_path.mkdir(parents=True, exist_ok=True)
+            manifest = {'languages': {}}
+
+            for language, rules in sorted(self.group_rules(rule_files).items()):
+                ruleset_file = output_path / f"{language}.xml"
+                self._write_ruleset(ruleset_file, language, rules.values())
+                manifest['languages'][language] = {
+                    'ruleset': ruleset_file.name,
+                    'rules': sorted(rules),
+                    'extensions': [LANGUAGE_EXTENSIONS.get(language, '.txt')],
+                    'sha256': hashlib.sha256(ruleset_file.read_bytes()).hexdigest()
+                }
+
+            manifest_file = output_path / self.MANIFEST_NAME
+            with open(manifest_file, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+
+            print(f"Bundled {len(manifest['languages'])} language rulesets into {output_path}")
+            return manifest_file
+
+        except Exception as e:
+            print(f"Error bundling rulesets: {e}")
+            return None
+
+    def load_manifest(self, manifest_file: Path) -> Optional[Dict]:
+        """
+        Read a manifest, resolving ruleset paths next to it
+        """
+        try:
+            manifest_file = Path(manifest_file)
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            for entry in manifest['languages'].values():
+                entry['path'] = str(manifest_file.parent / entry['ruleset'])
+            return manifest
+        except Exception as e:
+            print(f"Error reading bundle manifest: {e}")
+            return None
+
+    def _write_ruleset(self, ruleset_file: Path, language: str, rules: Iterable[ET.Element]) -> None:
+        root = ET.Element(f"{{{RULESET_NS}}}ruleset", {
+            'name': f"{PMD_RULE_METADATA['RULESET_NAME']} ({language})",
+            f"{{{XSI_NS}}}schemaLocation": PMD_RULE_METADATA['RULESET_SCHEMA_LOCATION']
+        })
+        description = ET.SubElement(root, f"{{{RULESET_NS}}}description")
+        description.text = f"Generated {language} rules"
+        root.extend(rules)
+
+        # Drop template indentation around XPath expressions
+        for value in root.iter(f"{{{RULESET_NS}}}value"):
+            if value.text:
+                value.text = value.text.strip()
+
+        tree = ET.ElementTree(root)
+        ET.indent(tree, space='  ')
+        tree.write(ruleset_file, encoding='UTF-8', xml_declaration=True)
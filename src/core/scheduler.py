@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+import threading
+import time
+
+from .constants import SCHEDULER_SETTINGS
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one pipeline stage
+
+    Each success raises the limit by increase/limit (about +increase per
+    window of 'limit' successes); each back-off multiplies it by
+    decrease, at most once per cooldown so one burst of errors counts once.
+    """
+
+    def __init__(self, name: str, initial: int, minimum: int, maximum: int,
+                 increase: float = 1.0, decrease: float = 0.5, cooldown: float = SCHEDULER_SETTINGS['BACKOFF_COOLDOWN']):
+        self.name = name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.active = 0
+        self.waiting = 0
+        self.backoffs = 0
+        self._last_backoff = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            self.waiting += 1
+            while self.active >= int(self.limit):
+                self._condition.wait()
+            self.waiting -= 1
+            self.active += 1
+
+    def release(self) -> None:
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        with self._condition:
+            self.limit = min(self.maximum, self.limit + self.increase / max(self.limit, 1.0))
+            self._condition.notify_all()
+
+    def on_backoff(self) -> None:
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_backoff < self.cooldown:
+                return
+            self._last_backoff = now
+            self.backoffs += 1
+            self.limit = max(self.minimum, self.limit * self.decrease)
+
+    def snapshot(self) -> Dict:
+        with self._condition:
+            return {
+                'limit': int(self.limit),
+                'active': self.active,
+                'queue_depth': self.waiting,
+                'backoffs': self.backoffs
+            }
+
+
+class PipelineScheduler:
+    """
+    Adaptive concurrency for the rule pipeline stages (ai, ast, validation)
+
+    Stages back off on HTTP 429/5xx, on poll latency rising above its
+    moving average, and (for the JVM stages) on host memory pressure.
+    """
+
+    def __init__(self, settings: Optional[Dict] = None):
+        self.settings = settings or SCHEDULER_SETTINGS
+        self.stages = {
+            name: AdaptiveLimiter(name, **self.settings['STAGES'][name])
+            for name in self.settings['STAGES']
+        }
+        self.latency = {}
+        self._lock = threading.Lock()
+        self._memory_checked_at = 0.0
+        self._memory_available = None
+
+    @contextmanager
+    def slot(self, stage: str) -> Iterator[None]:
+        """
+        Hold a concurrency slot of a stage for the duration of the block
+        """
+        if stage in self.settings['MEMORY_BOUND_STAGES'] and self.memory_pressure():
+            self.stages[stage].on_backoff()
+
+        limiter = self.stages[stage]
+        limiter.acquire()
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def report_status(self, stage: str, status_code: int) -> None:
+        """
+        Feed an HTTP status back into the stage limit
+        """
+        if status_code == 429 or status_code >= 500:
+            self.stages[stage].on_backoff()
+        elif status_code < 400:
+            self.stages[stage].on_success()
+
+    def report_success(self, stage: str) -> None:
+        self.stages[stage].on_success()
+
+    def report_failure(self, stage: str) -> None:
+        self.stages[stage].on_backoff()
+
+    def report_latency(self, stage: str, seconds: float) -> None:
+        """
+        Track latency and back off when it rises well above its average
+        """
+        with self._lock:
+            average = self.latency.get(stage)
+            alpha = self.settings['LATENCY_SMOOTHING']
+            self.latency[stage] = seconds if average is None else (1 - alpha) * average + alpha * seconds
+
+        if average is not None and seconds > average * self.settings['LATENCY_FACTOR']:
+            self.stages[stage].on_backoff()
+
+    def memory_pressure(self) -> bool:
+        """
+        Check whether available host memory is below the configured ratio
+        """
+        now = time.monotonic()
+        if now - self._memory_checked_at >= self.settings['MEMORY_CHECK_INTERVAL']:
+            self._memory_checked_at = now
+            self._memory_available = self._read_memory_available()
+
+        return (self._memory_available is not None
+                and self._memory_available < self.settings['MEMORY_MIN_AVAILABLE'])
+
+    def snapshot(self) -> Dict:
+        """
+        Current limits, active slots and queue depths per stage
+        """
+        with self._lock:
+            latency = {stage: round(value, 3) for stage, value in self.latency.items()}
+        return {
+            'stages': {
+                name: dict(limiter.snapshot(), latency_seconds=latency.get(name))
+                for name, limiter in self.stages.items()
+            },
+            'memory_available_ratio': (
+                round(self._memory_available, 3) if self._memory_available is not None else None
+            )
+        }
+
+    def _read_memory_available(self) -> Optional[float]:
+        """
+        Ratio of available to total memory from /proc/meminfo (Linux only)
+        """
+        try:
+            values = {}
+            with open('/proc/meminfo', 'r') as f:
+                for line in f:
+                    key, value = line.split(':', 1)
+                    values[key] = int(value.split()[0])
+            return values['MemAvailable'] / values['MemTotal']
+        except (OSError, KeyError, ValueError, ZeroDivisionError):
+            return None
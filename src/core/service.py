@@ -0,0 +1,428 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Iterable
+from urllib.parse import urlparse, parse_qs
+import ipaddress
+import json
+import os
+import threading
+import time
+
+from .bridge import RuleBridge
+from .baseline import IssueBaseline
+from .constants import SERVICE_SETTINGS, ISSUE_BASELINE
+
+CHUNK_SIZE = 64 * 1024
+
+
+def is_safe_file_name(name: str) -> bool:
+    """
+    Check that a client-supplied name is a bare file name, not a path
+    """
+    return (isinstance(name, str) and name not in ('', '.', '..')
+            and '/' not in name and '\\' not in name and '\0' not in name)
+
+
+def is_loopback_host(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class ServiceMetrics:
+    """
+    Thread-safe request and queueing counters exposed on /metrics
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.active = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.rejected = 0
+        self.queue_wait_seconds = 0.0
+        self.endpoints = {}
+
+    def record(self, endpoint: str, seconds: float, failed: bool) -> None:
+        with self.lock:
+            stats = self.endpoints.setdefault(endpoint, {'count': 0, 'errors': 0, 'total_seconds': 0.0})
+            stats['count'] += 1
+            stats['errors'] += int(failed)
+            stats['total_seconds'] += seconds
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started_at, 3),
+                'workers': {'max': self.max_workers, 'active': self.active},
+                'queue': {
+                    'max': self.max_queue,
+                    'depth': self.queued,
+                    'max_depth': self.max_queued,
+                    'rejected': self.rejected,
+                    'wait_seconds': round(self.queue_wait_seconds, 3)
+                },
+                'endpoints': {
+                    name: dict(stats, total_seconds=round(stats['total_seconds'], 3))
+                    for name, stats in self.endpoints.items()
+                }
+            }
+
+
+class RuleBridgeService:
+    """
+    Long-running wrapper keeping a warm RuleBridge for report conversion and rule generation
+    """
+
+    def __init__(self, bridge: Optional[RuleBridge] = None, max_workers: int = SERVICE_SETTINGS['MAX_WORKERS'],
+                 max_queue: int = SERVICE_SETTINGS['MAX_QUEUE'], output_dir: Optional[str] = None):
+        self.bridge = bridge or RuleBridge()
+        self.output_dir = Path(output_dir or SERVICE_SETTINGS['OUTPUT_DIR'])
+        self.baseline_dir = Path(ISSUE_BASELINE['SERVICE_DIR'])
+        # Keep AST dumps of repeated examples resident across requests
+        self.bridge.ast_manager.use_cache = True
+        self.bridge.ast_manager.cache_dir = Path('.ast_cache')
+        self.bridge.ast_manager.cache_dir.mkdir(exist_ok=True)
+        self.workers = threading.BoundedSemaphore(max_workers)
+        self.metrics = ServiceMetrics(max_workers, max_queue)
+
+    def acquire(self) -> bool:
+        """
+        Wait for a worker slot, or refuse when the queue is full
+        """
+        with self.metrics.lock:
+            if self.metrics.queued >= self.metrics.max_queue:
+                self.metrics.rejected += 1
+                return False
+            self.metrics.queued += 1
+            self.metrics.max_queued = max(self.metrics.max_queued, self.metrics.queued)
+
+        start_time = time.perf_counter()
+        self.workers.acquire()
+
+        with self.metrics.lock:
+            self.metrics.queued -= 1
+            self.metrics.active += 1
+            self.metrics.queue_wait_seconds += time.perf_counter() - start_time
+        return True
+
+    def release(self) -> None:
+        with self.metrics.lock:
+            self.metrics.active -= 1
+        self.workers.release()
+
+    def convert_report(self, violations: Iterable[Dict], baseline: Optional[IssueBaseline] = None,
+                       update_baseline: bool = False) -> Iterator[bytes]:
+        """
+        Stream a Sonarqube issues document for PMD violations
+        """
+        if baseline:
+            violations = baseline.filter_new(violations)
+
+        total = 0
+        yield b'{"issues": ['
+        for issue in self.bridge.iter_sonar_issues(violations):
+            prefix = b', ' if total else b''
+            yield prefix + json.dumps(issue, ensure_ascii=False).encode('utf-8')
+            total += 1
+        yield f'], "total": {total}'.encode('utf-8')
+
+        if baseline:
+            yield b', "fixed": ' + json.dumps(baseline.fixed(), ensure_ascii=False).encode('utf-8')
+            if update_baseline:
+                baseline.save()
+        yield b'}'
+
+    def sonar_rules(self, rules: Iterable[Dict], output_name: Optional[str] = None) -> Dict:
+        """
+        Convert PMD rules to Sonarqube format, optionally saving them in the output directory
+
+        output_name must be a bare file name (see is_safe_file_name).
+        """
+        rules = list(rules)
+        if output_name:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self.bridge.save_sonar_rules(rules, str(self.output_dir / output_name))
+        return self.bridge.build_sonar_rules(rules)
+
+    def generate(self, rule_config: Dict, reuse_existing: bool = True) -> Optional[str]:
+        """
+        Generate a rule in a private directory and return its XML
+
+        The rule name must be a bare file name (see is_safe_file_name).
+        """
+        with self.bridge.workspaces.job() as work_dir:
+            xml_file = self.bridge.generate_rule(
+                rule_config, work_dir / f"{rule_config['rule']['name']}.xml", reuse_existing
+            )
+            return xml_file.read_text(encoding='utf-8') if xml_file else None
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def service(self) -> RuleBridgeService:
+        return self.server.service
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif path == '/metrics':
+            self._send_json(200, dict(
+                self.service.metrics.snapshot(),
+                scheduler=self.service.bridge.scheduler.snapshot()
+            ))
+        else:
+            self._send_json(404, {'error': f"Unknown endpoint: {path}"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        routes = {
+            '/convert': self._handle_convert,
+            '/sonar-rules': self._handle_sonar_rules,
+            '/generate': self._handle_generate
+        }
+        handler = routes.get(url.path)
+        if not handler:
+            self._discard_body()
+            self._send_json(404, {'error': f"Unknown endpoint: {url.path}"})
+            return
+
+        if not self.service.acquire():
+            self._discard_body()
+            self._send_json(503, {'error': 'Service busy, request queue is full'}, {'Retry-After': '1'})
+            return
+
+        start_time = time.perf_counter()
+        failed = True
+        self.streaming = False
+        try:
+            failed = not handler(parse_qs(url.query))
+        except Exception as e:
+            print(f"Error handling {url.path}: {e}")
+            if self.streaming:
+                # Status and part of the body are already out, leave the
+                # chunked body unterminated so the client sees a failed transfer
+                self.close_connection = True
+            else:
+                self._send_json(500, {'error': str(e)})
+        finally:
+            self.service.release()
+            self.service.metrics.record(url.path, time.perf_counter() - start_time, failed)
+
+    def _handle_convert(self, query: Dict) -> bool:
+        """
+        Convert a PMD report, NDJSON bodies are processed one violation per line
+
+        JSON reports are parsed in memory and limited to
+        SERVICE_SETTINGS['MAX_JSON_BODY'] bytes; send large reports as NDJSON.
+
+        Query parameters baseline, source_root and update_baseline=1
+        restrict the output to new issues against an IssueBaseline. The
+        baseline is a file name inside the service baseline directory.
+        """
+        baseline = None
+        if 'baseline' in query:
+            baseline_name = query['baseline'][0]
+            if not is_safe_file_name(baseline_name):
+                self._discard_body()
+                self._send_json(400, {'error': "Parameter 'baseline' must be a file name, not a path"})
+                return False
+            baseline = IssueBaseline(
+                str(self.service.baseline_dir / baseline_name),
+                query.get('source_root', [None])[0]
+            )
+        update_baseline = query.get('update_baseline', ['0'])[0] in ('1', 'true')
+
+        content_type = self.headers.get('Content-Type', '')
+        if 'ndjson' in content_type:
+            violations = (json.loads(line) for line in self._iter_body_lines() if line.strip())
+        else:
+            body = self._read_body()
+            if body is None:
+                self._send_too_large()
+                return False
+            report = json.loads(body or b'{}')
+            # Flat or per-file (files[].violations) PMD reports
+            violations = self.service.bridge.analyzer.iter_violations(report)
+
+        self._send_stream(200, self.service.convert_report(violations, baseline, update_baseline))
+        return True
+
+    def _handle_sonar_rules(self, query: Dict) -> bool:
+        body = self._read_body()
+        if body is None:
+            self._send_too_large()
+            return False
+        payload = json.loads(body or b'[]')
+        rules = payload.get('rules', []) if isinstance(payload, dict) else payload
+        output_name = query.get('output', [None])[0]
+        if output_name is not None and not is_safe_file_name(output_name):
+            self._send_json(400, {'error': "Parameter 'output' must be a file name, not a path"})
+            return False
+
+        self._send_json(200, self.service.sonar_rules(rules, output_name))
+        return True
+
+    def _handle_generate(self, query: Dict) -> bool:
+        body = self._read_body()
+        if body is None:
+            self._send_too_large()
+            return False
+        rule_config = json.loads(body or b'{}')
+        if 'rule' not in rule_config:
+            self._send_json(400, {'error': "Missing 'rule' configuration"})
+            return False
+        if not is_safe_file_name(rule_config['rule'].get('name')):
+            self._send_json(400, {'error': "Rule name must not contain path separators"})
+            return False
+
+        regenerate = query.get('regenerate', ['0'])[0] in ('1', 'true')
+        rule_xml = self.service.generate(rule_config, reuse_existing=not regenerate)
+        if not rule_xml:
+            self._send_json(422, {'error': 'Rule generation failed'})
+            return False
+
+        self._send_stream(200, iter([rule_xml.encode('utf-8')]), 'application/xml')
+        return True
+
+    def _iter_body(self) -> Iterator[bytes]:
+        """
+        Read the request body incrementally (Content-Length or chunked)
+        """
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    # Skip optional trailers up to the final blank line
+                    while self.rfile.readline().strip():
+                        pass
+                    return
+                yield self.rfile.read(size)
+                self.rfile.readline()
+        else:
+            remaining = int(self.headers.get('Content-Length', 0))
+            while remaining > 0:
+                chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+    def _read_body(self, limit: int = SERVICE_SETTINGS['MAX_JSON_BODY']) -> Optional[bytes]:
+        """
+        Read the whole request body, or None when it exceeds limit bytes
+        """
+        if int(self.headers.get('Content-Length', 0)) > limit:
+            return None
+        body = bytearray()
+        for chunk in self._iter_body():
+            body += chunk
+            if len(body) > limit:
+                return None
+        return bytes(body)
+
+    def _send_too_large(self) -> None:
+        # The rest of the body is left unread, so the connection cannot be reused
+        self.close_connection = True
+        self._send_json(413, {'error': 'Request body too large, send PMD reports as NDJSON'})
+
+    def _iter_body_lines(self) -> Iterator[bytes]:
+        buffer = b''
+        for chunk in self._iter_body():
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            yield from lines
+        if buffer:
+            yield buffer
+
+    def _discard_body(self) -> None:
+        for _ in self._iter_body():
+            pass
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None) -> None:
+        body = json.dumps(payload, indent=2, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, status: int, parts: Iterator[bytes], content_type: str = 'application/json') -> None:
+        """
+        Send a chunked response, coalescing small parts up to CHUNK_SIZE
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.streaming = True
+
+        buffer = bytearray()
+        for part in parts:
+            buffer += part
+            if len(buffer) >= CHUNK_SIZE:
+                self._write_chunk(bytes(buffer))
+                buffer.clear()
+        if buffer:
+            self._write_chunk(bytes(buffer))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+
+    def address_string(self) -> str:
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+def serve(host: str = SERVICE_SETTINGS['HOST'], port: int = SERVICE_SETTINGS['PORT'],
+          socket_path: Optional[str] = None, max_workers: int = SERVICE_SETTINGS['MAX_WORKERS'],
+          max_queue: int = SERVICE_SETTINGS['MAX_QUEUE']) -> None:
+    """
+    Run the RuleBridge service on a TCP port or a unix socket
+
+    The service has no authentication, so TCP binds are limited to loopback.
+    """
+    if not socket_path and not is_loopback_host(host):
+        print(f"Refusing to listen on non-loopback host {host}, use 127.0.0.1 or a unix socket")
+        return
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, ServiceRequestHandler)
+        address = socket_path
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+        address = f"http://{host}:{port}"
+
+    server.service = RuleBridgeService(max_workers=max_workers, max_queue=max_queue)
+    print(f"RuleBridge service listening on {address}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -15,7 +15,7 @@ class XMLTemplates:
           language="{language}"
           message="{message}"
           class="{rule_class}">
-        <description>{severity_tag}</description>
+        <description>{severity_tag}{cost_tag}</description>
         <priority>{severity}</priority>
         <properties>
             <property name="xpath">
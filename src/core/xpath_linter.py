@@ -0,0 +1,268 @@
+from typing import Any, Dict, List, Optional
+import re
+import xml.etree.ElementTree as ET
+
+from .constants import XPATH_COST_WEIGHTS, XPATH_COST_THRESHOLDS
+from .compact_ast import CompactAST
+
+# Tokens after which a '//' starts a new, unanchored location path
+_PATH_START_TOKENS = ('(', '[', ',', '|', '=', '<', '>', '!', '+')
+_PATH_START_WORDS = ('and', 'or', 'div', 'mod', 'return', 'in', 'satisfies', 'then', 'else')
+_SIMPLE_ABSOLUTE_PATH = re.compile(r'^(/[\w:.-]+)+$')
+_NAME_TEST = re.compile(r'[\w:.-]+|\*|node\(\)')
+
+
+class XPathLinter:
+    """
+    Static cost analyzer for generated PMD XPath expressions
+    """
+
+    def lint(self, xpath: str) -> Dict:
+        """
+        Find descendant scans in an XPath expression and estimate its cost
+
+        Args:
+            xpath: XPath expression generated for the rule
+
+        Returns:
+            Dictionary with findings, cost score and cost class
+        """
+        findings = self._find_descendant_scans(xpath)
+        score = sum(self._finding_weight(finding) for finding in findings)
+
+        return {
+            'findings': findings,
+            'score': score,
+            'cost_class': self.cost_class(score)
+        }
+
+    def cost_class(self, score: int) -> str:
+        """
+        Map a cost score to its cost class (LOW, MEDIUM, HIGH)
+        """
+        for cost_class, threshold in XPATH_COST_THRESHOLDS:
+            if score <= threshold:
+                return cost_class
+        return 'HIGH'
+
+    def suggest_anchored(self, xpath: str, node_paths: Dict[str, List[str]]) -> Optional[str]:
+        """
+        Rewrite descendant scans into anchored child paths
+
+        Only descendant steps whose target node appears under a single
+        absolute path in the examples are rewritten.
+
+        Args:
+            xpath: XPath expression to rewrite
+            node_paths: Mapping of node name to absolute paths found in the examples
+
+        Returns:
+            Rewritten expression, or None if nothing could be anchored
+        """
+        rewritten = xpath
+        # Replace from the end so earlier offsets stay valid
+        for finding in reversed(self._find_descendant_scans(xpath)):
+            replacement = self._anchored_step(finding, node_paths)
+            if replacement is None:
+                continue
+            start = finding['offset']
+            end = start + len(finding['match'])
+            rewritten = rewritten[:start] + replacement + rewritten[end:]
+
+        return rewritten if rewritten != xpath else None
+
+    def collect_node_paths(self, examples: List[str], language: str, ast: Optional[Any] = None) -> Dict[str, List[str]]:
+        """
+        Collect absolute node paths from rule examples
+
+        Args:
+            examples: Source code examples (good and bad)
+            language: Programming language of the examples
+            ast: Optional AST (dict or CompactAST) of the bad example, used for non-XML languages
+
+        Returns:
+            Mapping of node name to the sorted list of absolute paths
+        """
+        paths = {}
+
+        if language.lower() == 'xml':
+            for example in examples:
+                try:
+                    root = ET.fromstring(example)
+                except ET.ParseError:
+                    continue
+                self._collect_element_paths(root, '', paths)
+        elif isinstance(ast, CompactAST):
+            return ast.node_paths()
+        elif ast:
+            self._collect_ast_paths(ast, '', paths)
+
+        return {name: sorted(found) for name, found in paths.items()}
+
+    def _find_descendant_scans(self, xpath: str) -> List[Dict]:
+        """
+        Locate '//' and descendant axis steps outside string literals
+        """
+        findings = []
+        predicates = []
+        quote = None
+        i = 0
+
+        while i < len(xpath):
+            char = xpath[i]
+
+            if quote:
+                if char == quote:
+                    quote = None
+            elif char in ('"', "'"):
+                quote = char
+            elif char == '[':
+                predicates.append(i)
+            elif char == ']':
+                if predicates:
+                    predicates.pop()
+            elif xpath.startswith('//', i):
+                findings.append(self._describe_scan(xpath, i, predicates))
+                i += 2
+                continue
+            elif xpath.startswith('descendant', i) and self._is_word_start(xpath, i):
+                axis = re.match(r'descendant(-or-self)?::', xpath[i:])
+                if axis:
+                    findings.append(self._describe_axis(xpath, i, axis.group(0), predicates))
+                    i += len(axis.group(0))
+                    continue
+            i += 1
+
+        return findings
+
+    def _describe_scan(self, xpath: str, offset: int, predicates: List[int]) -> Dict:
+        """
+        Classify a '//' occurrence by what precedes it
+        """
+        depth = len(predicates)
+        before = xpath[:offset].rstrip()
+        step = _NAME_TEST.match(xpath[offset + 2:])
+        step = step.group(0) if step else ''
+
+        if before.endswith('.') and not before.endswith('..'):
+            kind = 'context-descendant'
+            offset -= 1
+            match = f".//{step}"
+        elif self._starts_new_path(before):
+            kind = 'full-tree-scan'
+            match = f"//{step}"
+        else:
+            kind = 'descendant-step'
+            match = f"//{step}"
+
+        return {
+            'kind': kind,
+            'offset': offset,
+            'match': match,
+            'step': step,
+            'predicate_depth': depth,
+            'owner': xpath[:predicates[0]].strip() if predicates else None,
+            'wildcard': step in ('*', 'node()', ''),
+            'message': self._finding_message(kind, step, depth)
+        }
+
+    def _describe_axis(self, xpath: str, offset: int, axis: str, predicates: List[int]) -> Dict:
+        """
+        Classify an explicit descendant axis step
+        """
+        depth = len(predicates)
+        step = _NAME_TEST.match(xpath[offset + len(axis):])
+        step = step.group(0) if step else ''
+        kind = 'full-tree-scan' if self._starts_new_path(xpath[:offset].rstrip()) and depth == 0 else 'descendant-step'
+
+        return {
+            'kind': kind,
+            'offset': offset,
+            'match': f"{axis}{step}",
+            'step': step,
+            'predicate_depth': depth,
+            'owner': xpath[:predicates[0]].strip() if predicates else None,
+            'wildcard': step in ('*', 'node()', ''),
+            'message': self._finding_message(kind, step, depth)
+        }
+
+    def _starts_new_path(self, before: str) -> bool:
+        """
+        Check whether the text before a step leaves it unanchored
+        """
+        if not before or before.endswith(_PATH_START_TOKENS):
+            return True
+        last_word = re.search(r'(\w+)$', before)
+        return bool(last_word) and last_word.group(1) in _PATH_START_WORDS
+
+    def _is_word_start(self, xpath: str, offset: int) -> bool:
+        return offset == 0 or not (xpath[offset - 1].isalnum() or xpath[offset - 1] in '_-')
+
+    def _finding_weight(self, finding: Dict) -> int:
+        """
+        Weight a finding by scan kind, predicate nesting and wildcard use
+        """
+        weight = XPATH_COST_WEIGHTS[finding['kind']]
+        if finding['predicate_depth'] > 0 and finding['kind'] == 'full-tree-scan':
+            # Evaluated once per candidate node of the outer path
+            weight += XPATH_COST_WEIGHTS['nested']
+        if finding['wildcard']:
+            weight += XPATH_COST_WEIGHTS['wildcard']
+        return weight
+
+    def _finding_message(self, kind: str, step: str, depth: int) -> str:
+        target = step or 'node'
+        if kind == 'full-tree-scan':
+            where = ' inside a predicate' if depth > 0 else ''
+            return f"Unanchored descendant scan for '{target}'{where} visits the whole tree"
+        if kind == 'context-descendant':
+            return f"Descendant scan for '{target}' visits the whole subtree of the context node"
+        return f"Descendant step for '{target}' visits the whole subtree of the previous step"
+
+    def _anchored_step(self, finding: Dict, node_paths: Dict[str, List[str]]) -> Optional[str]:
+        """
+        Build the anchored replacement for a single finding
+        """
+        if finding['wildcard'] or finding['match'].startswith('descendant'):
+            return None
+
+        candidates = node_paths.get(finding['step'], [])
+        if len(candidates) != 1:
+            return None
+        target = candidates[0]
+
+        if finding['kind'] == 'full-tree-scan' and finding['predicate_depth'] == 0:
+            return target
+
+        if finding['kind'] == 'context-descendant':
+            context = self._context_path(finding)
+            if context and target.startswith(context + '/'):
+                return '.' + target[len(context):]
+
+        return None
+
+    def _context_path(self, finding: Dict) -> Optional[str]:
+        """
+        Resolve the absolute path owning the predicate a finding lives in
+        """
+        if finding['predicate_depth'] != 1:
+            return None
+        owner = finding.get('owner')
+        return owner if owner and _SIMPLE_ABSOLUTE_PATH.match(owner) else None
+
+    def _collect_element_paths(self, element: ET.Element, parent: str, paths: Dict) -> None:
+        name = element.tag.split('}')[-1]
+        path = f"{parent}/{name}"
+        paths.setdefault(name, set()).add(path)
+        for child in element:
+            self._collect_element_paths(child, path, paths)
+
+    def _collect_ast_paths(self, node: Dict, parent: str, paths: Dict) -> None:
+        if not isinstance(node, dict):
+            return
+        name = next((node[key] for key in ('xpathName', 'name', 'kind', 'type') if isinstance(node.get(key), str)), None)
+        path = f"{parent}/{name}" if name else parent
+        if name:
+            paths.setdefault(name, set()).add(path)
+        for child in node.get('children', []):
+            self._collect_ast_paths(child, path, paths)
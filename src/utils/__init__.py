@@ -1,4 +1,5 @@
 from .file_handler import FileHandler
 from .xml_validator import XMLValidator
+from .workspace import WorkspaceManager
 
-__all__ = ['FileHandler', 'XMLValidator'] 
\ No newline at end of file
+__all__ = ['FileHandler', 'XMLValidator', 'WorkspaceManager'] 
\ No newline at end of file
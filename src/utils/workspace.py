@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+
+from src.core.constants import WORKSPACE_SETTINGS
+
+
+class WorkspaceManager:
+    """
+    Hands out isolated per-job scratch directories for PMD inputs
+
+    Directories live under a private base directory (on tmpfs when
+    requested and available), are emptied and pooled on release, and
+    the whole base directory is removed when the manager is collected
+    or the interpreter exits.
+    """
+
+    def __init__(self, use_tmpfs: bool = WORKSPACE_SETTINGS['USE_TMPFS'],
+                 pool_size: int = WORKSPACE_SETTINGS['POOL_SIZE'], base_dir: Optional[str] = None):
+        self.pool_size = pool_size
+        self.base_dir = Path(tempfile.mkdtemp(prefix='rulebridge-', dir=base_dir or self._root_dir(use_tmpfs)))
+        self._pool: List[Path] = []
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, shutil.rmtree, str(self.base_dir), True)
+
+    def _root_dir(self, use_tmpfs: bool) -> Optional[str]:
+        tmpfs_dir = WORKSPACE_SETTINGS['TMPFS_DIR']
+        if use_tmpfs and os.path.isdir(tmpfs_dir) and os.access(tmpfs_dir, os.W_OK):
+            return tmpfs_dir
+        return None
+
+    def acquire(self) -> Path:
+        """
+        Get an empty job directory, reusing a pooled one when possible
+        """
+        with self._lock:
+            if self._pool:
+                return self._pool.pop()
+        return Path(tempfile.mkdtemp(prefix='job-', dir=self.base_dir))
+
+    def release(self, job_dir: Path) -> None:
+        """
+        Empty a job directory and return it to the pool
+        """
+        try:
+            for entry in job_dir.iterdir():
+                if entry.is_dir() and not entry.is_symlink():
+                    shutil.rmtree(entry, ignore_errors=True)
+                else:
+                    entry.unlink(missing_ok=True)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Error cleaning workspace {job_dir}: {e}")
+            shutil.rmtree(job_dir, ignore_errors=True)
+            return
+
+        with self._lock:
+            if len(self._pool) < self.pool_size:
+                self._pool.append(job_dir)
+                return
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+    @contextmanager
+    def job(self) -> Iterator[Path]:
+        """
+        Context manager yielding a job directory that is always released
+        """
+        job_dir = self.acquire()
+        try:
+            yield job_dir
+        finally:
+            self.release(job_dir)
+
+    def cleanup(self) -> None:
+        """
+        Remove every job directory and the base directory
+        """
+        with self._lock:
+            self._pool.clear()
+        self._finalizer()
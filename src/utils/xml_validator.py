@@ -1,36 +1,75 @@
 from pathlib import Path
-from typing import Union, Optional
-import tempfile
+from typing import Union, Optional, Dict
+import shutil
 from src.core.analyzer import PMDAnalyzer
+from src.core.constants import LANGUAGE_EXTENSIONS
+from .workspace import WorkspaceManager
 
 class XMLValidator:
+    def __init__(self, workspaces: Optional[WorkspaceManager] = None):
+        self.workspaces = workspaces or WorkspaceManager()
+        self.analyzer = PMDAnalyzer()
+
     def validate_pmd_rule(self, xml_file: Union[str, Path], language: str) -> bool:
         """
         Validate PMD rule by testing it against a bad example
         """
         try:
-            # Create temporary test file with known violation
-            with tempfile.NamedTemporaryFile(suffix=f'.{language}', mode='w', delete=False) as tmp:
-                tmp.write(self.get_test_code(language))
-                test_file = Path(tmp.name)
-
-            # Run PMD analysis
-            analyzer = PMDAnalyzer()
-            result = analyzer.analyze(
-                rule_file=Path(xml_file),
+            # Rule is valid if it finds at least one violation in the known bad code
+            return bool(self._count_violations(xml_file, language, self.get_test_code(language)))
+
+        except Exception as e:
+            print(f"Error validating rule: {e}")
+            return False
+
+    def _run_rule(self, xml_file: Union[str, Path], language: str, code: str) -> Optional[Dict]:
+        """
+        Run a rule on a code snippet inside an isolated job directory
+
+        Both the rule and the snippet are copied into the job directory,
+        so it is the only host directory mounted into the container.
+        """
+        with self.workspaces.job() as job_dir:
+            rule_file = job_dir / Path(xml_file).name
+            shutil.copyfile(xml_file, rule_file)
+            test_file = job_dir / f"test{LANGUAGE_EXTENSIONS.get(language.lower(), '.txt')}"
+            test_file.write_text(code, encoding='utf-8')
+
+            # Violations are the expected outcome here, not a failed run
+            return self.analyzer.analyze(
+                rule_file=rule_file,
                 source_path=test_file,
-                language=language
+                language=language,
+                fail_on_violation=False
             )
 
-            # Rule is valid if it finds at least one violation
-            return result is not None and len(result.get('violations', [])) > 0
+    def validate_against_examples(self, xml_file: Union[str, Path], language: str, examples: Dict) -> bool:
+        """
+        Validate PMD rule against the rule's own examples
+
+        The rule must report at least one violation on the bad example
+        and none on the good example.
+        """
+        bad_violations = self._count_violations(xml_file, language, examples.get('bad', ''))
+        if not bad_violations:
+            return False
+
+        if examples.get('good'):
+            return self._count_violations(xml_file, language, examples['good']) == 0
+
+        return True
+
+    def _count_violations(self, xml_file: Union[str, Path], language: str, code: str) -> Optional[int]:
+        """
+        Run the rule on a code snippet and count reported violations
+        """
+        try:
+            result = self._run_rule(xml_file, language, code)
+            return None if result is None else sum(1 for _ in self.analyzer.iter_violations(result))
 
         except Exception as e:
-            print(f"Error validating rule: {e}")
-            return False
-        finally:
-            if 'test_file' in locals():
-                test_file.unlink(missing_ok=True)
+            print(f"Error validating rule against example: {e}")
+            return None
 
     def get_test_code(self, language: str) -> str:
         """Get test code that should trigger the rule"""
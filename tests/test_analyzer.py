@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from src.core.analyzer import PMDAnalyzer
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def test_parse_benchmark_reads_rule_section():
+    output = (FIXTURES / 'pmd_benchmark.txt').read_text(encoding='utf-8')
+
+    timings = PMDAnalyzer()._parse_benchmark(output)
+
+    assert timings == {'AvoidSystemPrintln': 0.0274, 'DependencyVersionRequired': 0.0117}
+
+
+def test_parse_benchmark_without_rule_section():
+    assert PMDAnalyzer()._parse_benchmark('Wall Clock Time    1.2000\n') == {}
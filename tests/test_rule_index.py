@@ -0,0 +1,19 @@
+from src.core.rule_index import RuleIndex
+
+
+def test_portuguese_negation_is_not_a_duplicate(tmp_path):
+    index = RuleIndex(str(tmp_path / 'index'), str(tmp_path / 'library'))
+    index.add('CheckJacocoDependency', 'xml', "//dependency[groupId='org.jacoco']",
+              'O pom.xml deve conter a dependência do Jacoco (org.jacoco) na versão 0.8.12.')
+
+    negated = 'O pom.xml não deve conter a dependência do Jacoco (org.jacoco) na versão 0.8.12.'
+    same = 'O pom.xml deve conter a dependência do Jacoco (org.jacoco) na versão 0.8.12'
+
+    assert index.find_duplicate('xml', negated) is None
+    assert index.find_duplicate('xml', same)['name'] == 'CheckJacocoDependency'
+
+
+def test_tokenize_keeps_accented_words(tmp_path):
+    tokens = RuleIndex(str(tmp_path / 'index')).tokenize('Dependência não encontrada')
+
+    assert tokens == {'dependência', 'não', 'encontrada'}